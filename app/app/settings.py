@@ -21,12 +21,19 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-wwfhw4k%!td^8n#a+e1u0hq-+u(r--9rd1k8_!$v#dq^03wk+#'
+SECRET_KEY = os.environ.get(
+    'SECRET_KEY',
+    'django-insecure-wwfhw4k%!td^8n#a+e1u0hq-+u(r--9rd1k8_!$v#dq^03wk+#',
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = bool(int(os.environ.get('DEBUG', 1)))
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
 
 
 # Application definition
@@ -38,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'drf_spectacular',
@@ -47,11 +55,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -60,7 +72,7 @@ ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -84,12 +96,135 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
         'HOST': os.environ.get('DB_HOST'),
+        'PORT': os.environ.get('DB_PORT', ''),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        # Reuse each worker's connection across requests instead of paying
+        # connection setup every time; health checks replace connections
+        # the server has dropped. Under ASGI each request runs its queries
+        # on a fresh thread, so persistent connections would pile up until
+        # Postgres refuses new clients; pool with PgBouncer there instead.
+        'CONN_MAX_AGE': int(os.environ.get(
+            'DB_CONN_MAX_AGE',
+            0 if os.environ.get('SERVER_MODE') == 'asgi' else 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'application_name': os.environ.get('DB_APPLICATION_NAME', 'todo'),
+        },
     }
 }
 
+# Behind PgBouncer in transaction pooling mode consecutive transactions
+# may run on different server connections, so named server-side cursors
+# cannot be kept open across them.
+DB_PGBOUNCER = bool(int(os.environ.get('DB_PGBOUNCER', 0)))
+if DB_PGBOUNCER:
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+
+# Response compression
+# Static files are precompressed by WhiteNoise; other responses of these
+# content types are compressed on the fly once they reach
+# COMPRESSION_MIN_SIZE bytes. Compressed bodies of responses with an ETag
+# are cached for COMPRESSION_CACHE_TIMEOUT seconds (0 disables). HTML is
+# gzipped with up to COMPRESSION_MAX_RANDOM_BYTES of padding against BREACH.
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(
+    os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+COMPRESSION_CACHE_TIMEOUT = int(
+    os.environ.get('COMPRESSION_CACHE_TIMEOUT', 300))
+COMPRESSION_MAX_RANDOM_BYTES = int(
+    os.environ.get('COMPRESSION_MAX_RANDOM_BYTES', 100))
+COMPRESSION_CONTENT_TYPES = [
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'application/msgpack',
+    'application/xml',
+    'image/svg+xml',
+]
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The local-memory default is per process; point CACHE_BACKEND at a shared
+# backend such as django.core.cache.backends.redis.RedisCache when running
+# more than one worker so cache invalidation reaches all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'todo'),
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', 300)),
+    },
+    'sessions': {
+        'BACKEND': os.environ.get(
+            'SESSION_CACHE_BACKEND',
+            os.environ.get(
+                'CACHE_BACKEND',
+                'django.core.cache.backends.locmem.LocMemCache')),
+        'LOCATION': os.environ.get('SESSION_CACHE_LOCATION', 'sessions'),
+    },
+}
+
+
+# Sessions
+# SESSION_MODE picks where sessions live: db, cache (needs a shared,
+# persistent cache) or cached_db (reads from the cache, writes through to
+# the database). Every mode skips saving sessions whose data is unchanged.
+
+SESSION_ENGINES = {
+    'db': 'core.sessions.db',
+    'cache': 'core.sessions.cache',
+    'cached_db': 'core.sessions.cached_db',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_MODE', 'db')]
+SESSION_CACHE_ALIAS = 'sessions'
+
+
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new and rehashed passwords; the
+# others still verify existing hashes, which are upgraded on login.
+
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'core.hashers.PBKDF2PasswordHasher',
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CHOICES.items()
+    if name != PASSWORD_HASHER
+]
+
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 600000))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400))
+# One lane per hash: more lanes make argon2 hash on several cores at once,
+# beyond the hashing threads below. Each hash holds MEMORY_COST KiB.
+PASSWORD_ARGON2_PARALLELISM = int(
+    os.environ.get('PASSWORD_ARGON2_PARALLELISM', 1))
+PASSWORD_SCRYPT_WORK_FACTOR = int(
+    os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(
+    os.environ.get('PASSWORD_SCRYPT_BLOCK_SIZE', 8))
+PASSWORD_SCRYPT_PARALLELISM = int(
+    os.environ.get('PASSWORD_SCRYPT_PARALLELISM', 1))
+
+# Threads per process that hash passwords; logins beyond it queue. Every
+# gunicorn worker has its own pool, so the default splits the cores
+# between the WEB_CONCURRENCY workers, with at least one thread each.
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get('PASSWORD_HASHING_WORKERS') or
+    max(os.cpu_count() // int(os.environ.get('WEB_CONCURRENCY') or 1), 1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -126,6 +261,22 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.environ.get('STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+# Outside of DEBUG, collectstatic writes hashed, gzip and brotli copies of
+# every file, which WhiteNoise serves with far-future cache headers.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+            if DEBUG else
+            'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -138,7 +289,103 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.JSONParser',
+        'core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Proxies in front of the app that append to X-Forwarded-For, which
+    # rate limits read client IPs from. Left unset, DRF would trust the
+    # whole header as sent by the client. The production profile serves
+    # gunicorn directly, so none by default.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 LOGIN_REDIRECT_URL = '/todos'
 LOGOUT_REDIRECT_URL = '/user/login'
+
+
+# Largest number of todos accepted by one bulk API request.
+TODO_BULK_MAX_BATCH_SIZE = int(os.environ.get('TODO_BULK_MAX_BATCH_SIZE', 1000))
+
+# Todos per page of the htmx todo list; later pages load as the user
+# scrolls.
+TODO_PAGE_SIZE = int(os.environ.get('TODO_PAGE_SIZE', 50))
+
+# Rows fetched per round trip by the streaming todo export.
+TODO_EXPORT_CHUNK_SIZE = int(os.environ.get('TODO_EXPORT_CHUNK_SIZE', 2000))
+
+# Rows validated and loaded per transaction by the todo import, and how
+# they are loaded: 'copy' (Postgres COPY) or 'bulk_create'.
+TODO_IMPORT_BATCH_SIZE = int(os.environ.get('TODO_IMPORT_BATCH_SIZE', 5000))
+TODO_IMPORT_METHOD = os.environ.get('TODO_IMPORT_METHOD', 'copy')
+
+# Failed rows whose errors are reported by a todo import.
+TODO_IMPORT_MAX_ERRORS = int(os.environ.get('TODO_IMPORT_MAX_ERRORS', 100))
+
+# Days deleted todos are remembered for delta sync. Clients syncing from an
+# older token receive a full snapshot instead.
+TODO_TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get('TODO_TOMBSTONE_RETENTION_DAYS', 30))
+
+# Seconds a token's user id is cached in the shared cache, and the size
+# and lifetime of each process's own copy of the most used tokens. Saving
+# a user invalidates their tokens; deactivating users with
+# queryset.update() does not, and takes up to TOKEN_AUTH_CACHE_TIMEOUT
+# to apply.
+TOKEN_AUTH_CACHE_TIMEOUT = int(os.environ.get('TOKEN_AUTH_CACHE_TIMEOUT', 60))
+TOKEN_AUTH_LOCAL_CACHE_SIZE = int(
+    os.environ.get('TOKEN_AUTH_LOCAL_CACHE_SIZE', 1024))
+TOKEN_AUTH_LOCAL_CACHE_TIMEOUT = int(
+    os.environ.get('TOKEN_AUTH_LOCAL_CACHE_TIMEOUT', 10))
+
+# Lifetimes in seconds of signed access and refresh tokens.
+SIGNED_TOKEN_ACCESS_LIFETIME = int(
+    os.environ.get('SIGNED_TOKEN_ACCESS_LIFETIME', 5 * 60))
+SIGNED_TOKEN_REFRESH_LIFETIME = int(
+    os.environ.get('SIGNED_TOKEN_REFRESH_LIFETIME', 14 * 24 * 60 * 60))
+
+# Attempts allowed per client IP and per email on the login and token
+# endpoints, and per IP on signup, counted over a sliding window.
+RATE_LIMITS = {
+    'login': {
+        'ip': os.environ.get('LOGIN_RATE_IP', '30/min'),
+        'email': os.environ.get('LOGIN_RATE_EMAIL', '5/min'),
+    },
+    'signup': {
+        'ip': os.environ.get('SIGNUP_RATE_IP', '10/hour'),
+    },
+}
+RATE_LIMIT_CACHE = 'default'
+
+# Share of requests whose SQL queries are counted and timed by
+# core.middleware.QueryInstrumentationMiddleware.
+QUERY_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get(
+    'QUERY_INSTRUMENTATION_SAMPLE_RATE', 0.05))
+
+# Bearer token Prometheus sends to read /metrics. Without one, metrics are
+# only served to clients on the loopback interface.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.queries': {
+            'handlers': ['console'],
+            'level': os.environ.get('QUERY_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
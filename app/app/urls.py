@@ -22,9 +22,12 @@ from drf_spectacular.views import (
 from django.contrib import admin
 from django.urls import path, include
 
+from core import views as core_views
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', core_views.metrics, name='metrics'),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
     path(
         'api/docs/',
@@ -34,5 +37,6 @@ urlpatterns = [
     path('api/user/', include('user.urls')),
     path('api/', include('todo.urls')),
     path('todos/', include('todo.urls')),
+    path('async/', include('todo.async_urls')),
     path('user/', include('user.urls'))
 ]
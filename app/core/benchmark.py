@@ -0,0 +1,246 @@
+"""
+Benchmark scenarios for the htmx and REST hot paths.
+
+Scenarios run against a live server as seeded benchmark users; see the
+seed_benchmark and benchmark management commands. Todos created by write
+scenarios are deleted after each run, so the users keep their seeded
+size.
+"""
+import datetime
+import io
+import time
+from collections import namedtuple
+from importlib import import_module
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from core.models import Todo, TodoTombstone
+from core.parsers import JSONParser, MessagePackParser
+from core.renderers import FastJSONRenderer, MessagePackRenderer
+from todo import writes
+from todo.serializers import TodoSerializer
+
+
+SIZES = [10, 1000, 100000]
+PASSWORD = 'benchmark-pass-123'
+SEED_BATCH_SIZE = 5000
+
+# Metrics where a higher value is a regression.
+HIGHER_IS_WORSE = ['p50', 'p99', 'queries']
+
+Scenario = namedtuple('Scenario', 'name method path data login')
+Format = namedtuple('Format', 'name media_type renderer parser')
+
+# Paths and form data are formatted with the benchmark user's email and
+# the id of one of its todos.
+SCENARIOS = [
+    Scenario('list_todos', 'GET', '/todos/', None, True),
+    Scenario('create_todo', 'POST', '/todos/create_todo/',
+             {'content': 'benchmark'}, True),
+    Scenario('update_todo', 'PUT', '/todos/update_todo/{todo}/', None, True),
+    Scenario('api_list', 'GET', '/api/todos/', None, True),
+    Scenario('api_retrieve', 'GET', '/api/todos/{todo}/', None, True),
+    Scenario('api_create', 'POST', '/api/todos/',
+             {'content': 'benchmark'}, True),
+    Scenario('create_token', 'POST', '/api/user/token/',
+             {'email': '{email}', 'password': PASSWORD}, False),
+]
+
+# Response formats compared by bench_formats.
+FORMATS = [
+    Format('json', 'application/json', FastJSONRenderer, JSONParser),
+    Format('json_columnar', 'application/json; layout=columnar',
+           FastJSONRenderer, JSONParser),
+    Format('msgpack', 'application/msgpack', MessagePackRenderer,
+           MessagePackParser),
+    Format('msgpack_columnar', 'application/msgpack; layout=columnar',
+           MessagePackRenderer, MessagePackParser),
+]
+
+
+def bench_email(size):
+    """Return the email of the benchmark user with size todos."""
+    return f'bench{size}@example.com'
+
+
+def seed_user(size):
+    """Create the benchmark user with size todos, topping up if needed."""
+    user, created = get_user_model().objects.get_or_create(
+        email=bench_email(size), defaults={'name': f'bench{size}'})
+    if created:
+        user.set_password(PASSWORD)
+        user.save()
+
+    now = timezone.now()
+    existing = Todo.objects.filter(user=user).count()
+    for start in range(existing, size, SEED_BATCH_SIZE):
+        Todo.objects.bulk_create(
+            Todo(
+                user=user,
+                content=f'benchmark todo {n}',
+                status=n % 3 == 0,
+                priority=n % 5 == 0,
+                due_date=now + datetime.timedelta(days=n % 60 - 30),
+            )
+            for n in range(start, min(start + SEED_BATCH_SIZE, size))
+        )
+
+    return user, max(size - existing, 0)
+
+
+def latest_todo_id(user):
+    """Return the id of the newest todo of a user, or 0."""
+    latest = Todo.objects.filter(user=user).order_by('-id').values_list(
+        'id', flat=True).first()
+    return latest or 0
+
+
+def delete_new_todos(user, after_id):
+    """Delete the todos of a user with an id above after_id.
+
+    Their tombstones go too, as no client has synced them. Returns the
+    number of todos deleted.
+    """
+    pks = list(Todo.objects.filter(user=user, id__gt=after_id).values_list(
+        'id', flat=True))
+    if pks:
+        writes.delete_todos(user, pks)
+        TodoTombstone.objects.filter(user=user, todo_id__in=pks).delete()
+    return len(pks)
+
+
+def create_session(user):
+    """Return the key of a new session logged in as the user."""
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return session.session_key
+
+
+def login_headers(user):
+    """Return request headers carrying a session and a CSRF token."""
+    csrf_token = get_random_string(32)
+    return {
+        'Cookie': (f'{settings.SESSION_COOKIE_NAME}={create_session(user)}; '
+                   f'{settings.CSRF_COOKIE_NAME}={csrf_token}'),
+        'X-CSRFToken': csrf_token,
+    }
+
+
+def build_request(scenario, user):
+    """Return the path and urlencoded body of a scenario for a user."""
+    todo = Todo.objects.filter(user=user).values_list('id', flat=True)[:1]
+    values = {'email': user.email, 'todo': todo[0] if todo else 0}
+    path = scenario.path.format(**values)
+    if scenario.data is None:
+        return path, None
+
+    data = {key: value.format(**values)
+            for key, value in scenario.data.items()}
+    return path, urlencode(data)
+
+
+def count_queries(client, scenario, path, body):
+    """Return the queries a warm request of a scenario runs.
+
+    Returns None if the request fails, e.g. when the host of the client
+    is not in ALLOWED_HOSTS.
+    """
+    def send():
+        return client.generic(
+            scenario.method, path, body or '',
+            content_type='application/x-www-form-urlencoded')
+
+    send()
+    with CaptureQueriesContext(connection) as ctx:
+        response = send()
+    if response.status_code >= 400:
+        return None
+    return len(ctx.captured_queries)
+
+
+def compare(results, baseline, threshold):
+    """Return the regressions of results against a baseline.
+
+    Throughput regresses when it drops by more than threshold, latency
+    when it grows by more than threshold and query counts on any growth.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if base.get('rps') and result['rps'] < base['rps'] * (1 - threshold):
+            regressions.append(
+                f'{key}: rps {result["rps"]} < baseline {base["rps"]}')
+        for metric in HIGHER_IS_WORSE:
+            if base.get(metric) is None or result.get(metric) is None:
+                continue
+            limit = base[metric] if metric == 'queries' else \
+                base[metric] * (1 + threshold)
+            if result[metric] > limit:
+                regressions.append(
+                    f'{key}: {metric} {result[metric]} > '
+                    f'baseline {base[metric]}')
+
+    return regressions
+
+
+def sample_todos(count):
+    """Return count unsaved todos and the same todos as .values() rows."""
+    now = timezone.now()
+    todos = [
+        Todo(
+            id=n,
+            user_id=1,
+            content=f'benchmark todo {n} – café',
+            status=n % 3 == 0,
+            priority=n % 5 == 0,
+            due_date=None if n % 4 == 0 else
+            now + datetime.timedelta(days=n % 60 - 30, microseconds=n),
+            created_at=now - datetime.timedelta(seconds=n),
+        )
+        for n in range(count)
+    ]
+    rows = [
+        {field: getattr(todo, field) for field in TodoSerializer.Meta.fields}
+        for todo in todos
+    ]
+    return todos, rows
+
+
+def measure_format(fmt, data, repeat):
+    """Return the encoded size and best encode and decode times of data.
+
+    Decoding includes turning the columnar layout back into objects, as
+    a client would.
+    """
+    renderer, parser = fmt.renderer(), fmt.parser()
+    encode = decode = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = renderer.render(data, fmt.media_type)
+        encode = min(encode, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        decoded = parser.parse(io.BytesIO(body), fmt.media_type)
+        decode = min(decode, time.perf_counter() - start)
+
+    return {
+        'bytes': len(body),
+        'encode_ms': round(encode * 1000, 2),
+        'decode_ms': round(decode * 1000, 2),
+    }, decoded
@@ -0,0 +1,162 @@
+"""
+Response compression with gzip and brotli.
+
+Responses are compressed with the coding the client prefers among those
+available, brotli first on a tie. Compressed bodies are cached under a
+digest of the plain body, so a hot list is compressed once per coding
+rather than on every request.
+
+HTML pages echo request data next to secrets such as the CSRF token, so
+compressing them exposes those secrets to BREACH. They are compressed
+with gzip only, padded with a random-length file name in the gzip header
+as Django's GZipMiddleware does, and never cached.
+"""
+import gzip
+import hashlib
+import secrets
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.metrics import CACHE_REQUESTS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+BROTLI = 'br'
+GZIP = 'gzip'
+
+COMPRESSED_KEY = 'compressed:{coding}:{level}:{digest}'
+
+
+def get_codings():
+    """Return the available codings, most preferred first."""
+    return [BROTLI, GZIP] if brotli is not None else [GZIP]
+
+
+def get_level(coding):
+    """Return the configured compression level of a coding."""
+    if coding == BROTLI:
+        return settings.COMPRESSION_BROTLI_QUALITY
+    return settings.COMPRESSION_GZIP_LEVEL
+
+
+def parse_accept_encoding(header):
+    """Return the quality of each coding in an Accept-Encoding header."""
+    qualities = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding:
+            qualities[coding.strip().lower()] = quality
+    return qualities
+
+
+def choose_coding(header, codings=None):
+    """Return the coding to compress a response with, or None."""
+    qualities = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for coding in codings or get_codings():
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(data, coding):
+    """Return data compressed with a coding."""
+    if coding == BROTLI:
+        return brotli.compress(data, quality=get_level(BROTLI))
+    return gzip.compress(data, compresslevel=get_level(GZIP), mtime=0)
+
+
+def compress_padded(data):
+    """Return data gzipped with up to COMPRESSION_MAX_RANDOM_BYTES of padding.
+
+    The padding goes in the file name field of the gzip header, so the
+    length of the response no longer tells an attacker how well a guess
+    compressed against a secret.
+    """
+    compressed = compress(data, GZIP)
+    if not settings.COMPRESSION_MAX_RANDOM_BYTES:
+        return compressed
+    header = bytearray(compressed[:10])
+    header[3] = gzip.FNAME
+    filename = b'a' * secrets.randbelow(settings.COMPRESSION_MAX_RANDOM_BYTES)
+    return bytes(header) + filename + b'\x00' + compressed[10:]
+
+
+def compress_cached(data, coding):
+    """Return data compressed, reusing the copy cached for the same body."""
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    key = COMPRESSED_KEY.format(
+        coding=coding, level=get_level(coding), digest=digest)
+
+    compressed = cache.get(key)
+    if compressed is None:
+        CACHE_REQUESTS.labels('compressed', 'miss').inc()
+        compressed = compress(data, coding)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    else:
+        CACHE_REQUESTS.labels('compressed', 'hit').inc()
+
+    return compressed
+
+
+class StreamCompressor:
+    """Incremental compressor flushing after every chunk.
+
+    Flushing lets the client decode each chunk as it arrives, which is
+    the point of streaming, at some cost in compression ratio.
+    """
+
+    def __init__(self, coding):
+        self.coding = coding
+        if coding == BROTLI:
+            self.compressor = brotli.Compressor(quality=get_level(BROTLI))
+        else:
+            # wbits=31 writes the gzip header and trailer.
+            self.compressor = zlib.compressobj(get_level(GZIP), wbits=31)
+
+    def compress(self, chunk):
+        """Return the compressed bytes of a chunk, flushed."""
+        if self.coding == BROTLI:
+            return self.compressor.process(chunk) + self.compressor.flush()
+        return self.compressor.compress(chunk) + \
+            self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        """Return the end of the compressed stream."""
+        if self.coding == BROTLI:
+            return self.compressor.finish()
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+def compress_stream(chunks, coding):
+    """Yield the chunks of a streaming response compressed."""
+    compressor = StreamCompressor(coding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, coding):
+    """Yield the chunks of an async streaming response compressed."""
+    compressor = StreamCompressor(coding)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
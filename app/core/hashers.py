@@ -0,0 +1,106 @@
+"""
+Password hashers with configurable cost, run in a bounded pool.
+
+The cost of each hasher comes from settings. Changing it, or the
+preferred hasher, rehashes a stored password the next time its user logs
+in, as Django does whenever a hasher reports must_update().
+
+Hashing runs on a dedicated pool of PASSWORD_HASHING_WORKERS threads in
+each process, so a burst of logins hashes at most that many passwords at
+once per process however many web threads are waiting on it; across a
+host the bound is that times the number of gunicorn workers. The hash
+functions release the GIL, so the other web threads keep serving
+requests meanwhile.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+POOL_THREAD_PREFIX = 'password-hashing'
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    """Return the process's password hashing pool, creating it once."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                thread_name_prefix=POOL_THREAD_PREFIX,
+            )
+        return _pool
+
+
+def run_in_hashing_pool(func, *args, **kwargs):
+    """Run func on the hashing pool and return its result.
+
+    Calls made from the pool itself run directly, since waiting on the
+    pool from one of its threads could deadlock.
+    """
+    if threading.current_thread().name.startswith(POOL_THREAD_PREFIX):
+        return func(*args, **kwargs)
+    return get_hashing_pool().submit(func, *args, **kwargs).result()
+
+
+class OffloadedHasherMixin:
+    """Run encode() and verify() on the password hashing pool."""
+
+    def encode(self, *args, **kwargs):
+        return run_in_hashing_pool(super().encode, *args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        return run_in_hashing_pool(super().verify, *args, **kwargs)
+
+
+class PBKDF2PasswordHasher(OffloadedHasherMixin,
+                           hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with PASSWORD_PBKDF2_ITERATIONS iterations."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(OffloadedHasherMixin,
+                           hashers.Argon2PasswordHasher):
+    """Argon2id with costs from the PASSWORD_ARGON2_* settings."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class ScryptPasswordHasher(OffloadedHasherMixin,
+                           hashers.ScryptPasswordHasher):
+    """scrypt with costs from the PASSWORD_SCRYPT_* settings."""
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # OpenSSL refuses more than 32 MiB unless told otherwise.
+        return 2 * 128 * self.work_factor * self.block_size
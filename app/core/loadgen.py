@@ -0,0 +1,79 @@
+"""
+A small closed-loop HTTP load generator for benchmarking the app.
+"""
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(samples, pct):
+    """Return the pct percentile of sorted samples, nearest rank."""
+    if not samples:
+        return None
+    rank = max(math.ceil(pct / 100 * len(samples)), 1)
+    return round(samples[rank - 1], 3)
+
+
+def fetch(url, headers, timeout, method='GET', data=None):
+    """Request url and return its status, or None on a network error."""
+    request = urllib.request.Request(
+        url, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+def run_load(url, requests, concurrency, headers=None, timeout=30,
+             method='GET', data=None):
+    """Send requests to url from concurrency workers and summarise them.
+
+    Each worker sends its next request as soon as the previous one is
+    answered, so throughput is bounded by the server, not the client.
+    Latencies are in milliseconds.
+    """
+    headers = headers or {}
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            start = time.perf_counter()
+            status = fetch(url, headers, timeout, method, data)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if status is None or status >= 400:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'url': url,
+        'requests': len(latencies),
+        'errors': errors,
+        'concurrency': concurrency,
+        'duration': round(duration, 3),
+        'rps': round(len(latencies) / duration, 1) if duration else None,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+    }
@@ -0,0 +1,44 @@
+"""
+Benchmark the response formats of the API.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import FORMATS, measure_format, sample_todos
+from todo.serializers import serialize_todo_rows
+
+
+class Command(BaseCommand):
+    """Command to compare payload size and coding time of each format."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', type=int, default=500,
+                            help='Todos per list, as in one API page.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', help='Write results to this file.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        _, rows = sample_todos(options['todos'])
+        data = {'next': None, 'previous': None,
+                'results': serialize_todo_rows(rows)}
+
+        results = {}
+        self.stdout.write('format\tbytes\t% of json\tencode ms\tdecode ms')
+        for fmt in FORMATS:
+            result, decoded = measure_format(fmt, data, options['repeat'])
+            if decoded != data:
+                raise CommandError(f'{fmt.name} does not round-trip.')
+
+            result['relative_size'] = round(
+                result['bytes'] / results.get('json', result)['bytes'], 3)
+            results[fmt.name] = result
+            self.stdout.write(
+                f'{fmt.name}\t{result["bytes"]}\t'
+                f'{result["relative_size"] * 100:.1f}\t'
+                f'{result["encode_ms"]}\t{result["decode_ms"]}')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
@@ -0,0 +1,52 @@
+"""
+Benchmark password hashers at their configured cost.
+"""
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    """Command to measure logins per second per core for each hasher."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20,
+                            help='Password checks per hasher.')
+        parser.add_argument('--output', help='Write results to this file.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        results = {}
+        self.stdout.write('hasher\tlogins/s/core\tms/login')
+        for name, path in settings.PASSWORD_HASHER_CHOICES.items():
+            hasher = import_string(path)()
+            try:
+                encoded = hasher.encode('benchmark-pass-123', hasher.salt())
+            except ValueError as exc:
+                # Raised when the hasher's library is not installed.
+                self.stderr.write(f'{name}: {exc}')
+                continue
+
+            # One thread checks passwords one at a time, so this is the
+            # rate of a single core.
+            start = time.perf_counter()
+            for _ in range(options['logins']):
+                hasher.verify('benchmark-pass-123', encoded)
+            elapsed = time.perf_counter() - start
+
+            results[name] = {
+                'logins_per_sec_per_core': round(
+                    options['logins'] / elapsed, 2),
+                'ms_per_login': round(elapsed * 1000 / options['logins'], 2),
+                'hash': encoded.rsplit('$', 2)[0],
+            }
+            self.stdout.write(
+                f'{name}\t{results[name]["logins_per_sec_per_core"]}\t'
+                f'{results[name]["ms_per_login"]}')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
@@ -0,0 +1,61 @@
+"""
+Benchmark the todo list serialization paths.
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmark import sample_todos
+from core.renderers import FastJSONRenderer
+from todo.serializers import TodoSerializer, serialize_todo_rows
+
+
+class Command(BaseCommand):
+    """Command to compare TodoSerializer with the values() fast path."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', type=int, default=5000,
+                            help='Todos per serialization.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--output', help='Write results to this file.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        todos, rows = sample_todos(options['todos'])
+        paths = {
+            'serializer': lambda: JSONRenderer().render(
+                TodoSerializer(todos, many=True).data),
+            'fast': lambda: FastJSONRenderer().render(
+                serialize_todo_rows(rows)),
+        }
+
+        outputs, timings, results = {}, {}, {}
+        self.stdout.write('path\ttodos/s\tms/list')
+        for name, serialize in paths.items():
+            # Best of several runs, to leave out GC pauses and warm up.
+            best = float('inf')
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                outputs[name] = serialize()
+                best = min(best, time.perf_counter() - start)
+
+            timings[name] = best
+            results[name] = {
+                'todos_per_sec': round(options['todos'] / best),
+                'ms_per_list': round(best * 1000, 2),
+            }
+            self.stdout.write(
+                f'{name}\t{results[name]["todos_per_sec"]}\t'
+                f'{results[name]["ms_per_list"]}')
+
+        if outputs['fast'] != outputs['serializer']:
+            raise CommandError('The fast path output differs.')
+        results['speedup'] = round(
+            timings['serializer'] / timings['fast'], 1)
+        self.stdout.write(f'speedup\t{results["speedup"]}x')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
@@ -0,0 +1,107 @@
+"""
+Benchmark the htmx and REST hot paths of a running server.
+"""
+import json
+import platform
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.utils import timezone
+
+from core import loadgen
+from core.benchmark import (
+    SCENARIOS,
+    SIZES,
+    bench_email,
+    build_request,
+    compare,
+    count_queries,
+    delete_new_todos,
+    latest_todo_id,
+    login_headers,
+)
+
+
+class Command(BaseCommand):
+    """Command to record throughput, latency and queries per request.
+
+    Run seed_benchmark first. Todos created by a scenario are deleted
+    once it has run. Results are keyed by scenario@size and can be saved
+    as JSON and compared against a stored baseline.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+        parser.add_argument('--scenarios', nargs='+',
+                            choices=[s.name for s in SCENARIOS])
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--output', help='Write results to this file.')
+        parser.add_argument('--baseline',
+                            help='Fail on regressions against this file.')
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help='Allowed relative throughput or latency '
+                                 'regression.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        base_url = options['base_url'].rstrip('/')
+        host = base_url.split('://')[-1]
+        scenarios = [s for s in SCENARIOS if options['scenarios'] is None
+                     or s.name in options['scenarios']]
+        results = {}
+
+        self.stdout.write('scenario\trps\tp50 ms\tp99 ms\tqueries\terrors')
+        for size in options['sizes']:
+            try:
+                user = get_user_model().objects.get(email=bench_email(size))
+            except get_user_model().DoesNotExist:
+                raise CommandError(
+                    f'No benchmark user for {size}; run seed_benchmark.')
+
+            client = Client(HTTP_HOST=host)
+            client.force_login(user)
+            for scenario in scenarios:
+                path, body = build_request(scenario, user)
+                last_id = latest_todo_id(user)
+                headers = login_headers(user) if scenario.login else {}
+                if body is not None:
+                    headers['Content-Type'] = \
+                        'application/x-www-form-urlencoded'
+
+                result = loadgen.run_load(
+                    base_url + path, options['requests'],
+                    options['concurrency'], headers, method=scenario.method,
+                    data=body and body.encode())
+                result['queries'] = count_queries(
+                    client if scenario.login else Client(HTTP_HOST=host),
+                    scenario, path, body)
+                delete_new_todos(user, last_id)
+
+                key = f'{scenario.name}@{size}'
+                results[key] = result
+                self.stdout.write(
+                    f'{key}\t{result["rps"]}\t{result["p50"]:.1f}\t'
+                    f'{result["p99"]:.1f}\t{result["queries"]}\t'
+                    f'{result["errors"]}')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'created_at': timezone.now().isoformat(),
+                    'python': platform.python_version(),
+                    'requests': options['requests'],
+                    'concurrency': options['concurrency'],
+                    'results': results,
+                }, f, indent=2)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+            regressions = compare(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError(
+                    'Benchmark regressed:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions.'))
@@ -0,0 +1,66 @@
+"""
+Import todos for a user from an NDJSON or CSV file.
+"""
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.imports import METHODS, READERS, import_todos
+
+
+class Command(BaseCommand):
+    """Command to bulk load todos."""
+    help = ('Load todos from an NDJSON or CSV file (- for stdin) for a '
+            'user, reporting progress and the rows that failed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--email', required=True,
+                            help='Import the todos for this user.')
+        parser.add_argument('--format', choices=sorted(READERS),
+                            help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int,
+                            help='Defaults to TODO_IMPORT_BATCH_SIZE.')
+        parser.add_argument('--method', choices=METHODS,
+                            help='Defaults to TODO_IMPORT_METHOD.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["email"]}.')
+
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in READERS:
+            raise CommandError('Pass --format ndjson or --format csv.')
+
+        start = time.perf_counter()
+
+        def progress(result):
+            elapsed = time.perf_counter() - start
+            rows = result['imported'] + result['failed']
+            self.stdout.write(
+                f'{rows} rows, {result["imported"]} imported, '
+                f'{result["failed"]} failed, {rows / elapsed:.0f} rows/sec')
+
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            result = import_todos(
+                user, READERS[file_format](stream),
+                batch_size=options['batch_size'],
+                method=options['method'],
+                progress=progress,
+            )
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        for error in result['errors']:
+            self.stderr.write(f'line {error["line"]}: {error["errors"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result["imported"]} todos, '
+            f'{result["failed"]} rows failed.'))
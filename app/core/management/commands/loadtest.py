@@ -0,0 +1,46 @@
+"""
+Load test running servers as a logged in user.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import create_session
+from core.loadgen import run_load
+
+
+class Command(BaseCommand):
+    """Command to compare throughput and latency of URLs."""
+    help = ('Send concurrent requests to each URL, e.g. the sync view on '
+            'a WSGI server and the async view on an ASGI server, and '
+            'report requests/sec and latency percentiles.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+')
+        parser.add_argument('--email', help='Log in as this user.')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=100)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        headers = {}
+        if options['email']:
+            headers['Cookie'] = (f'{settings.SESSION_COOKIE_NAME}='
+                                 f'{self.login(options["email"])}')
+
+        self.stdout.write('url\trps\tp50 ms\tp99 ms\terrors')
+        for url in options['urls']:
+            result = run_load(url, options['requests'],
+                              options['concurrency'], headers)
+            self.stdout.write(
+                f'{url}\t{result["rps"]}\t{result["p50"]:.1f}\t'
+                f'{result["p99"]:.1f}\t{result["errors"]}')
+
+    def login(self, email):
+        """Return the key of a new session logged in as the user."""
+        try:
+            user = get_user_model().objects.get(email=email)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {email}')
+
+        return create_session(user)
@@ -0,0 +1,59 @@
+"""
+Report database connection usage for sizing the connection pool.
+"""
+import psycopg2
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    """Command to print database connection statistics."""
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if settings.DB_PGBOUNCER:
+            self.write_pgbouncer_pools()
+        else:
+            self.write_server_connections()
+
+    def write_server_connections(self):
+        """Write Postgres backend counts per application and state."""
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW max_connections')
+            max_connections = cursor.fetchone()[0]
+            cursor.execute(
+                'SELECT application_name, state, count(*) '
+                'FROM pg_stat_activity WHERE datname = current_database() '
+                'GROUP BY 1, 2 ORDER BY 1, 2'
+            )
+            rows = cursor.fetchall()
+
+        self.stdout.write(f'max_connections: {max_connections}')
+        self.stdout.write(
+            f'conn_max_age: {connection.settings_dict["CONN_MAX_AGE"]}')
+        for application_name, state, count in rows:
+            self.stdout.write(
+                f'{application_name or "-"}\t{state or "-"}\t{count}')
+        self.stdout.write(
+            f'connections: {sum(count for _, _, count in rows)}')
+
+    def write_pgbouncer_pools(self):
+        """Write PgBouncer pool statistics from its admin console."""
+        params = connection.get_connection_params()
+        params.pop('application_name', None)
+        params['database'] = 'pgbouncer'
+        admin = psycopg2.connect(**params)
+        admin.autocommit = True
+        try:
+            with admin.cursor() as cursor:
+                cursor.execute('SHOW POOLS')
+                columns = [col[0] for col in cursor.description]
+                rows = cursor.fetchall()
+        finally:
+            admin.close()
+
+        self.stdout.write('\t'.join(columns))
+        for row in rows:
+            self.stdout.write('\t'.join(str(value) for value in row))
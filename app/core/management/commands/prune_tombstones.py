@@ -0,0 +1,24 @@
+"""
+Delete todo tombstones past their retention.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import TodoTombstone
+
+
+class Command(BaseCommand):
+    """Command to prune todo tombstones."""
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        cutoff = timezone.now() - datetime.timedelta(
+            days=settings.TODO_TOMBSTONE_RETENTION_DAYS)
+        deleted, _ = TodoTombstone.objects.filter(
+            deleted_at__lt=cutoff).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} tombstones.'))
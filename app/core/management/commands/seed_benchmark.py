@@ -0,0 +1,29 @@
+"""
+Seed benchmark users with todos.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import SIZES, bench_email, seed_user
+from todo.cache import invalidate_todo_list
+
+
+class Command(BaseCommand):
+    """Command to create the users the benchmark runs as."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=SIZES,
+                            help='Todo counts of the benchmark users.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        for size in options['sizes']:
+            user, created = seed_user(size)
+            invalidate_todo_list(user.pk)
+            self.stdout.write(
+                f'{bench_email(size)}: created {created} todos.')
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_todo')
+
+        self.stdout.write(self.style.SUCCESS('Seeded benchmark users.'))
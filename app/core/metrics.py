@@ -0,0 +1,99 @@
+"""
+Prometheus metrics for the app.
+
+Under gunicorn each worker process keeps its own values. Set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers
+so the /metrics endpoint reports the sum over all of them.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+from django.template.backends.django import DjangoTemplates, Template
+
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, float('inf'))
+
+REQUEST_LATENCY = Histogram(
+    'todo_http_request_duration_seconds',
+    'Request latency by view.',
+    ['view', 'method', 'status'],
+)
+REQUEST_EXCEPTIONS = Counter(
+    'todo_http_exceptions_total',
+    'Unhandled exceptions raised by views.',
+    ['view', 'exception'],
+)
+DB_QUERIES = Histogram(
+    'todo_db_queries_per_request',
+    'SQL queries run per request by view.',
+    ['view'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    'todo_db_duration_seconds',
+    'Total SQL time per request by view.',
+    ['view'],
+)
+TEMPLATE_RENDER = Histogram(
+    'todo_template_render_seconds',
+    'Template render time by template.',
+    ['template'],
+)
+AUTH_FAILURES = Counter(
+    'todo_auth_failures_total',
+    'Failed logins and requests rejected as unauthenticated.',
+    ['reason'],
+)
+CACHE_REQUESTS = Counter(
+    'todo_cache_requests_total',
+    'Cache lookups by cache and result.',
+    ['cache', 'result'],
+)
+
+
+def get_registry():
+    """Return the registry to expose, merging worker processes if needed."""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics():
+    """Return the exposition text of all metrics and its content type."""
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+class TimedTemplate(Template):
+    """Template recording its render time."""
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            name = self.origin.template_name or '<string>'
+            TEMPLATE_RENDER.labels(name).observe(time.perf_counter() - start)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend recording template render times."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
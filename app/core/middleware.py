@@ -0,0 +1,382 @@
+"""
+Middleware for the app.
+"""
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.auth.middleware import (
+    AuthenticationMiddleware as BaseAuthenticationMiddleware,
+)
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from core import compression, metrics
+
+
+query_logger = logging.getLogger('core.queries')
+
+# Longest SQL logged for the slowest query of a request.
+MAX_LOGGED_SQL = 500
+
+
+class AuthenticationMiddleware(BaseAuthenticationMiddleware):
+    """Authentication middleware that also serves async views.
+
+    Under WSGI request.user stays lazy as usual. Under ASGI the session
+    and user are loaded once up front in a worker thread, since async
+    views cannot touch the ORM synchronously when they read request.user.
+    """
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        user = await sync_to_async(get_user)(request)
+        request.user = user
+
+        async def auser():
+            return user
+
+        request.auser = auser
+        return await self.get_response(request)
+
+
+class SyncAndAsyncMiddleware:
+    """Base for middleware serving both sync and async requests.
+
+    Like Django's MiddlewareMixin, it runs in the mode of the handler it
+    wraps, so an ASGI request stays on the event loop: subclasses
+    implement __call__ for sync requests and __acall__ for async ones.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise middleware that also serves async requests.
+
+    Looking the path up in WhiteNoise's file index does not block, so
+    other requests pass straight through; static files are opened and
+    served in a worker thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(
+                request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class CompressionMiddleware(SyncAndAsyncMiddleware):
+    """Compress responses with brotli or gzip, as the client accepts.
+
+    Bodies shorter than COMPRESSION_MIN_SIZE or of a content type not in
+    COMPRESSION_CONTENT_TYPES are sent as they are. Streaming responses
+    are compressed chunk by chunk. The compressed bodies of successful
+    GET responses with an ETag are cached. HTML is only gzipped, with
+    random padding, and streamed HTML is left alone; see core.compression.
+    Under ASGI bodies large enough to compress are compressed in a
+    worker thread, off the event loop.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if response.streaming or \
+                len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return self.process_response(request, response)
+        return await sync_to_async(self.process_response)(request, response)
+
+    def process_response(self, request, response):
+        """Return the response compressed, if it and the client allow."""
+        if response.has_header('Content-Encoding') or \
+                not self.is_compressible(response):
+            return response
+
+        html = self.is_html(response)
+        if html and response.streaming:
+            return response
+
+        patch_vary_headers(response, ['Accept-Encoding'])
+        coding = compression.choose_coding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+            [compression.GZIP] if html else None)
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(
+                    response.streaming_content, coding)
+            else:
+                response.streaming_content = compression.compress_stream(
+                    response.streaming_content, coding)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            if html:
+                compressed = compression.compress_padded(response.content)
+            else:
+                compressed = self.compress(request, response, coding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The ETag stays usable for conditional requests but, as the
+        # compressed bytes differ, it is no longer a strong validator.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = coding
+        return response
+
+    def is_compressible(self, response):
+        """Return whether the response has a compressible content type."""
+        content_type = response.get('Content-Type', '').lower()
+        return any(content_type.startswith(prefix)
+                   for prefix in settings.COMPRESSION_CONTENT_TYPES)
+
+    def is_html(self, response):
+        """Return whether the response is an HTML page."""
+        return response.get('Content-Type', '').lower().startswith(
+            'text/html')
+
+    def compress(self, request, response, coding):
+        """Return the compressed body, cached if the response allows."""
+        etag = response.get('ETag')
+        if etag and settings.COMPRESSION_CACHE_TIMEOUT and \
+                request.method in ('GET', 'HEAD') and \
+                response.status_code == 200 and \
+                'no-store' not in response.get('Cache-Control', ''):
+            return compression.compress_cached(response.content, coding)
+        return compression.compress(response.content, coding)
+
+
+class QueryCounter:
+    """Count and time the queries fed to it; see count_queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def record(self, sql, duration):
+        """Count a query that ran for duration seconds."""
+        self.count += 1
+        self.duration += duration
+
+
+class QueryStats(QueryCounter):
+    """Query counter that also tracks repeated and slow statements."""
+
+    def __init__(self):
+        super().__init__()
+        self.statements = Counter()
+        self.slowest = (0.0, None)
+
+    def record(self, sql, duration):
+        super().record(sql, duration)
+        self.statements[sql] += 1
+        if self.slowest[1] is None or duration > self.slowest[0]:
+            self.slowest = (duration, sql)
+
+    @property
+    def duplicates(self):
+        """Return the number of queries repeating an earlier statement.
+
+        Statements are compared before parameters are bound, so a query
+        run once per row of a list shows up here.
+        """
+        return self.count - len(self.statements)
+
+
+# The counters of the request being handled. Unlike an execute wrapper
+# installed on the current thread's connections, a context variable
+# follows the request into the threads sync_to_async runs queries in.
+request_query_counters = ContextVar('request_query_counters', default=())
+
+
+def record_request_queries(execute, sql, params, many, context):
+    """Execute wrapper feeding queries to the current request's counters.
+
+    It is installed on every connection when it is created, and costs a
+    context variable lookup outside of counted requests.
+    """
+    counters = request_query_counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for counter in counters:
+            counter.record(sql, duration)
+
+
+@contextmanager
+def count_queries(counter):
+    """Feed the queries run within the block to counter."""
+    token = request_query_counters.set(
+        request_query_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        request_query_counters.reset(token)
+
+
+class QueryInstrumentationMiddleware(SyncAndAsyncMiddleware):
+    """Report the SQL queries of a sample of requests.
+
+    Sampled requests get a Server-Timing header with the query count and
+    database time, and a log line on the core.queries logger with the
+    duplicate statement count and the slowest query. The share of
+    requests sampled is QUERY_INSTRUMENTATION_SAMPLE_RATE.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sample():
+            return self.get_response(request)
+
+        with count_queries(QueryStats()) as stats:
+            response = self.get_response(request)
+        self.report(request, response, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sample():
+            return await self.get_response(request)
+
+        with count_queries(QueryStats()) as stats:
+            response = await self.get_response(request)
+        self.report(request, response, stats)
+        return response
+
+    def sample(self):
+        """Return whether to instrument the current request."""
+        return random.random() < settings.QUERY_INSTRUMENTATION_SAMPLE_RATE
+
+    def report(self, request, response, stats):
+        """Report the query statistics of a sampled request."""
+        self.add_server_timing(response, stats)
+        self.log(request, response, stats)
+
+    def add_server_timing(self, response, stats):
+        """Add the database time and query count to Server-Timing."""
+        timing = (f'db;dur={stats.duration * 1000:.1f};'
+                  f'desc="{stats.count} queries"')
+        if response.has_header('Server-Timing'):
+            timing = f'{response["Server-Timing"]}, {timing}'
+        response['Server-Timing'] = timing
+
+    def log(self, request, response, stats):
+        """Log the query statistics of a request."""
+        match = getattr(request, 'resolver_match', None)
+        duration, sql = stats.slowest
+        query_logger.info(
+            'method=%s path=%s view=%s status=%s queries=%d duplicates=%d '
+            'db_ms=%.1f slowest_ms=%.1f slowest_sql="%s"',
+            request.method,
+            request.path,
+            match.view_name if match else '-',
+            response.status_code,
+            stats.count,
+            stats.duplicates,
+            stats.duration * 1000,
+            duration * 1000,
+            (sql or '')[:MAX_LOGGED_SQL],
+            extra={
+                'view': match.view_name if match else None,
+                'queries': stats.count,
+                'duplicates': stats.duplicates,
+                'db_ms': stats.duration * 1000,
+            },
+        )
+
+
+class MetricsMiddleware(SyncAndAsyncMiddleware):
+    """Record Prometheus metrics for every request.
+
+    It should come first in MIDDLEWARE so the latency covers the other
+    middleware too. Queries are only counted and timed, which is cheap
+    enough for every request; QueryInstrumentationMiddleware looks at
+    the statements of a sample.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        with count_queries(QueryCounter()) as queries:
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with count_queries(QueryCounter()) as queries:
+            response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    def record(self, request, response, duration, queries):
+        """Record the latency and queries of a request."""
+        view = self.get_view_name(request)
+        metrics.REQUEST_LATENCY.labels(
+            view, request.method, response.status_code).observe(duration)
+        metrics.DB_QUERIES.labels(view).observe(queries.count)
+        metrics.DB_DURATION.labels(view).observe(queries.duration)
+        if response.status_code in (401, 403):
+            metrics.AUTH_FAILURES.labels(
+                f'status_{response.status_code}').inc()
+
+    def process_exception(self, request, exception):
+        metrics.REQUEST_EXCEPTIONS.labels(
+            self.get_view_name(request), type(exception).__name__).inc()
+
+    def get_view_name(self, request):
+        """Return the resolved view name, which bounds label cardinality."""
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match else '<unresolved>'
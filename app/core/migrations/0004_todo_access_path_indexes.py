@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:47
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0003_todo_user_created_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(fields=['user', 'status'], name='core_todo_user_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(fields=['user', 'priority', 'due_date'], name='core_todo_user_priority_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('status', False)), fields=['user', 'due_date'], name='core_todo_user_open_due_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_todo_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='todo',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
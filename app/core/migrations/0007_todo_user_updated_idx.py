@@ -0,0 +1,20 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:54
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_todotombstone'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(fields=['user', 'updated_at'], name='core_todo_user_updated_idx'),
+        ),
+    ]
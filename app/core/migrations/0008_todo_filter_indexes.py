@@ -0,0 +1,37 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:56
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0007_todo_user_updated_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(fields=['user', 'priority', 'due_date', 'id'], name='core_todo_user_prio_due_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(fields=['user', 'due_date', 'id'], name='core_todo_user_due_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='todo',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('content', config='english'), name='core_todo_content_search_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='todo',
+            name='core_todo_user_priority_idx',
+        ),
+    ]
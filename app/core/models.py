@@ -2,6 +2,8 @@
 Database models.
 """
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -54,6 +56,44 @@ class Todo(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     priority = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'],
+                         name='core_todo_user_created_idx'),
+            models.Index(fields=['user', 'status'],
+                         name='core_todo_user_status_idx'),
+            models.Index(fields=['user', 'priority', 'due_date', 'id'],
+                         name='core_todo_user_prio_due_idx'),
+            models.Index(fields=['user', 'due_date', 'id'],
+                         name='core_todo_user_due_idx'),
+            models.Index(fields=['user', 'due_date'],
+                         condition=models.Q(status=False),
+                         name='core_todo_user_open_due_idx'),
+            models.Index(fields=['user', 'updated_at'],
+                         name='core_todo_user_updated_idx'),
+            # Must match todo.filters.search_vector() to be used.
+            GinIndex(SearchVector('content', config='english'),
+                     name='core_todo_content_search_idx'),
+        ]
 
     def __str__(self):
         return self.content
+
+
+class TodoTombstone(models.Model):
+    """Record of a deleted todo, kept for delta sync."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE)
+    todo_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'],
+                         name='core_tombstone_user_del_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.todo_id)
@@ -0,0 +1,77 @@
+"""
+Parsers shared by the APIs.
+
+Request bodies can be sent as JSON or MessagePack, either of them in the
+columnar layout of core.renderers when the Content-Type carries
+layout=columnar.
+"""
+import msgpack
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from core.renderers import is_columnar
+
+
+def from_columnar(data):
+    """Return data in the columnar layout with its lists as objects.
+
+    The reverse of core.renderers.to_columnar: a top-level object or the
+    results of a paginated response holding only "fields" and "rows" are
+    expanded, anything else is left as it is.
+    """
+    if isinstance(data, dict) and isinstance(data.get('results'), dict):
+        return {**data, 'results': from_columnar(data['results'])}
+    if not isinstance(data, dict) or data.keys() != {'fields', 'rows'}:
+        return data
+
+    fields, rows = data['fields'], data['rows']
+    if not isinstance(fields, list) or not isinstance(rows, list) or \
+            any(not isinstance(row, list) or len(row) != len(fields)
+                for row in rows):
+        raise ParseError('Columnar rows must be lists as long as fields.')
+    return [dict(zip(fields, row)) for row in rows]
+
+
+class ColumnarParserMixin:
+    """Parser support for the columnar layout."""
+
+    def prepare_data(self, data, media_type):
+        """Return parsed data as objects if sent in the columnar layout."""
+        if is_columnar(media_type):
+            return from_columnar(data)
+        return data
+
+
+class JSONParser(ColumnarParserMixin, parsers.JSONParser):
+    """Parse JSON, accepting the columnar layout."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        data = super().parse(stream, media_type, parser_context)
+        return self.prepare_data(data, media_type)
+
+
+def reject_ext_type(code, data):
+    """Refuse MessagePack extension types, which have no JSON equivalent."""
+    raise ValueError(f'extension type {code} is not supported')
+
+
+class MessagePackParser(ColumnarParserMixin, parsers.BaseParser):
+    """Parse MessagePack, accepting the columnar layout.
+
+    Only values JSON could carry are accepted, plus timestamps, which are
+    read as aware datetimes; other extension types are refused.
+    """
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            data = msgpack.unpackb(
+                stream.read(),
+                strict_map_key=False,
+                ext_hook=reject_ext_type,
+                timestamp=3,
+            )
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            # Maps keyed by arrays or maps raise TypeError (unhashable).
+            raise ParseError(f'MessagePack parse error - {exc}')
+        return self.prepare_data(data, media_type)
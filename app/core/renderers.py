@@ -0,0 +1,128 @@
+"""
+Renderers shared by the APIs.
+
+Besides JSON, responses can be negotiated as MessagePack. Either format
+takes a layout=columnar media type parameter, e.g.
+"Accept: application/msgpack; layout=columnar", which sends lists of
+objects as their field names once followed by one array per object.
+"""
+import msgpack
+from django.utils.cache import patch_vary_headers
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.mediatypes import _MediaType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+COLUMNAR = 'columnar'
+
+
+def dumps(data):
+    """Return data as compact UTF-8 JSON, like JSONRenderer's default.
+
+    Uses orjson when installed, falling back to the json module for
+    values orjson does not handle, such as lazy translation strings.
+    """
+    if orjson is not None:
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            pass
+        else:
+            # Escaped by JSONRenderer for embedding in JavaScript.
+            return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029')
+
+    return FastJSONRenderer.fallback.render(data)
+
+
+def is_columnar(media_type):
+    """Return whether a media type asks for the columnar layout."""
+    if not media_type:
+        return False
+    layout = _MediaType(media_type).params.get('layout', '')
+    return force_str(layout).strip('"') == COLUMNAR
+
+
+def to_columnar(data):
+    """Return data with lists of objects as field names and rows.
+
+    Applies to a top-level list and to the results of a paginated
+    response; lists whose objects differ in fields are left as they are.
+    """
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return {**data, 'results': to_columnar(data['results'])}
+    if not isinstance(data, list) or \
+            not all(isinstance(item, dict) for item in data):
+        return data
+
+    fields = list(data[0]) if data else []
+    keys = set(fields)
+    if any(item.keys() != keys for item in data):
+        return data
+    return {
+        'fields': fields,
+        'rows': [[item[field] for field in fields] for item in data],
+    }
+
+
+class ColumnarRendererMixin:
+    """Renderer support for the columnar layout."""
+
+    def prepare_data(self, data, accepted_media_type, renderer_context):
+        """Return data in the negotiated layout, varying on Accept."""
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            patch_vary_headers(response, ['Accept'])
+        if is_columnar(accepted_media_type):
+            return to_columnar(data)
+        return data
+
+
+class FastJSONRenderer(ColumnarRendererMixin, JSONRenderer):
+    """JSONRenderer encoding with orjson when output would be the same.
+
+    Indented output and non-default UNICODE_JSON, COMPACT_JSON or
+    STRICT_JSON settings go through JSONRenderer.
+    """
+    fallback = JSONRenderer()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        data = self.prepare_data(data, accepted_media_type, renderer_context)
+        if data is None or self.ensure_ascii or not self.compact or \
+                not self.strict or self.get_indent(
+                    accepted_media_type or '', renderer_context or {}):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+
+        return dumps(data)
+
+
+def encode_msgpack_default(value):
+    """Encode values msgpack has no type for, as the JSON encoder does."""
+    if isinstance(value, Promise):
+        return force_str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class MessagePackRenderer(ColumnarRendererMixin, BaseRenderer):
+    """Render MessagePack, a compact binary equivalent of JSON."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        data = self.prepare_data(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_msgpack_default)
@@ -0,0 +1,6 @@
+"""
+Session engines that skip saving sessions whose data did not change.
+
+Set SESSION_ENGINE to core.sessions.db, core.sessions.cache or
+core.sessions.cached_db; each wraps the Django engine of the same name.
+"""
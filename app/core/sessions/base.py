@@ -0,0 +1,32 @@
+"""
+Write coalescing for session stores.
+"""
+
+
+class CoalescingSessionMixin:
+    """Skip saving a loaded session whose data is unchanged.
+
+    Django saves a session whenever it is marked modified, which any
+    assignment does even when the value is the same. Comparing the
+    serialized data with what was loaded drops those writes.
+    """
+    _loaded_state = None
+
+    def serialize_session(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        if self.session_key is not None:
+            self._loaded_state = self.serialize_session(data)
+        return data
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        state = self.serialize_session(data)
+        if not must_create and self.session_key is not None and \
+                state == self._loaded_state:
+            return
+
+        super().save(must_create=must_create)
+        self._loaded_state = state
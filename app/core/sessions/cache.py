@@ -0,0 +1,10 @@
+"""
+The cache session engine with write coalescing.
+"""
+from django.contrib.sessions.backends import cache
+
+from core.sessions.base import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, cache.SessionStore):
+    pass
@@ -0,0 +1,10 @@
+"""
+The cached_db session engine with write coalescing.
+"""
+from django.contrib.sessions.backends import cached_db
+
+from core.sessions.base import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, cached_db.SessionStore):
+    pass
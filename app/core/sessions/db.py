@@ -0,0 +1,10 @@
+"""
+The db session engine with write coalescing.
+"""
+from django.contrib.sessions.backends import db
+
+from core.sessions.base import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, db.SessionStore):
+    pass
@@ -0,0 +1,22 @@
+"""
+Signal handlers for the core app.
+"""
+from django.contrib.auth.signals import user_login_failed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.metrics import AUTH_FAILURES
+from core.middleware import record_request_queries
+
+
+@receiver(user_login_failed)
+def count_login_failure(sender, credentials, request=None, **kwargs):
+    """Count failed logins, from the login form or the token API."""
+    AUTH_FAILURES.labels('login').inc()
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Let the metrics middleware count the queries of the connection."""
+    if record_request_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_request_queries)
@@ -2,13 +2,24 @@
 Test custom management commands.
 """
 
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2OpError
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from core.benchmark import FORMATS, PASSWORD, SCENARIOS, bench_email
+from core.models import Todo, TodoTombstone
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -33,3 +44,186 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+class PruneTombstonesCommandTests(TestCase):
+    """Test the prune_tombstones command."""
+
+    def test_prune_tombstones(self):
+        """Test tombstones past the retention are deleted."""
+        user = get_user_model().objects.create_user(
+            'test@example.com', 'testpass123')
+        old = TodoTombstone.objects.create(user=user, todo_id=1)
+        TodoTombstone.objects.filter(id=old.id).update(
+            deleted_at=timezone.now() - datetime.timedelta(days=365))
+        recent = TodoTombstone.objects.create(user=user, todo_id=2)
+
+        call_command('prune_tombstones', stdout=StringIO())
+
+        self.assertEqual(
+            list(TodoTombstone.objects.values_list('id', flat=True)),
+            [recent.id])
+
+
+class PoolStatsCommandTests(TestCase):
+    """Test the pool_stats command."""
+
+    def test_pool_stats(self):
+        """Test connection statistics are reported."""
+        out = StringIO()
+
+        call_command('pool_stats', stdout=out)
+
+        self.assertIn('max_connections:', out.getvalue())
+        self.assertIn('connections:', out.getvalue())
+
+
+class LoadtestCommandTests(TestCase):
+    """Test the loadtest command."""
+
+    @patch('core.loadgen.fetch', return_value=200)
+    def test_loadtest(self, patched_fetch):
+        """Test each URL is loaded with a logged in session cookie."""
+        get_user_model().objects.create_user(
+            'test@example.com', 'testpass123')
+        out = StringIO()
+
+        call_command('loadtest', 'http://sync/', 'http://async/',
+                     email='test@example.com', requests=20, concurrency=4,
+                     stdout=out)
+
+        self.assertEqual(patched_fetch.call_count, 40)
+        headers = patched_fetch.call_args.args[1]
+        self.assertTrue(headers['Cookie'].startswith('sessionid='))
+        self.assertIn('http://async/\t', out.getvalue())
+
+
+class BenchmarkCommandTests(TestCase):
+    """Test the seed_benchmark and benchmark commands."""
+
+    def setUp(self):
+        call_command('seed_benchmark', sizes=[3], stdout=StringIO())
+
+    def test_seed_benchmark(self):
+        """Test seeding creates the user and tops up its todos."""
+        user = get_user_model().objects.get(email=bench_email(3))
+        Todo.objects.filter(user=user).first().delete()
+
+        call_command('seed_benchmark', sizes=[3], stdout=StringIO())
+
+        self.assertEqual(Todo.objects.filter(user=user).count(), 3)
+        self.assertTrue(user.check_password(PASSWORD))
+
+    @patch('core.loadgen.fetch', return_value=200)
+    def test_benchmark_writes_results(self, patched_fetch):
+        """Test results are recorded per scenario and size as JSON."""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'results.json')
+            call_command('benchmark', base_url='http://testserver',
+                         sizes=[3], requests=4, concurrency=2,
+                         output=output, stdout=StringIO())
+            with open(output) as f:
+                results = json.load(f)['results']
+
+        self.assertEqual(set(results),
+                         {f'{scenario.name}@3' for scenario in SCENARIOS})
+        self.assertEqual(results['api_list@3']['requests'], 4)
+        self.assertGreater(results['api_list@3']['queries'], 0)
+
+    @patch('core.loadgen.fetch', return_value=200)
+    def test_benchmark_deletes_created_todos(self, patched_fetch):
+        """Test write scenarios leave the seeded todos as they were."""
+        user = get_user_model().objects.get(email=bench_email(3))
+        seeded = set(Todo.objects.filter(user=user).values_list(
+            'id', flat=True))
+
+        call_command('benchmark', base_url='http://testserver', sizes=[3],
+                     requests=2, scenarios=['create_todo', 'api_create'],
+                     stdout=StringIO())
+
+        self.assertEqual(set(Todo.objects.filter(user=user).values_list(
+            'id', flat=True)), seeded)
+        self.assertFalse(TodoTombstone.objects.filter(user=user).exists())
+
+    @patch('core.loadgen.fetch', return_value=200)
+    def test_benchmark_fails_on_regression(self, patched_fetch):
+        """Test a run slower than the baseline fails."""
+        baseline = {'results': {'api_list@3': {
+            'rps': 10 ** 9, 'p50': None, 'p99': None, 'queries': 0}}}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            with open(path, 'w') as f:
+                json.dump(baseline, f)
+
+            with self.assertRaisesMessage(CommandError, 'api_list@3: rps'):
+                call_command('benchmark', sizes=[3], requests=2,
+                             scenarios=['api_list'], baseline=path,
+                             stdout=StringIO())
+
+
+class ImportTodosCommandTests(TestCase):
+    """Test the import_todos command."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@example.com', 'testpass123')
+
+    def test_import_todos_csv(self):
+        """Test todos are loaded from a CSV file in batches."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'todos.csv')
+            with open(path, 'w') as f:
+                f.write('content,status,priority\n')
+                f.writelines(f'todo {n},false,{n % 2}\n' for n in range(5))
+                f.write(',true,0\n')
+            out, err = StringIO(), StringIO()
+
+            call_command('import_todos', path, email=self.user.email,
+                         batch_size=2, stdout=out, stderr=err)
+
+        todos = Todo.objects.filter(user=self.user).order_by('id')
+        self.assertEqual([t.content for t in todos],
+                         [f'todo {n}' for n in range(5)])
+        self.assertEqual([t.priority for t in todos],
+                         [False, True, False, True, False])
+        self.assertIn('Imported 5 todos, 1 rows failed.', out.getvalue())
+        self.assertEqual(out.getvalue().count('rows/sec'), 3)
+        self.assertIn('line 7', err.getvalue())
+
+    def test_import_todos_unknown_user(self):
+        """Test importing for a missing user fails."""
+        with self.assertRaisesMessage(CommandError, 'No user'):
+            call_command('import_todos', 'todos.ndjson',
+                         email='missing@example.com', stdout=StringIO())
+
+
+class BenchSerializersCommandTests(SimpleTestCase):
+    """Test the bench_serializers command."""
+
+    def test_bench_serializers(self):
+        """Test both paths are timed and their outputs match."""
+        out = StringIO()
+
+        call_command('bench_serializers', todos=50, repeat=1, stdout=out)
+
+        self.assertIn('serializer\t', out.getvalue())
+        self.assertIn('fast\t', out.getvalue())
+        self.assertIn('speedup\t', out.getvalue())
+
+
+class BenchFormatsCommandTests(SimpleTestCase):
+    """Test the bench_formats command."""
+
+    def test_bench_formats(self):
+        """Test every format is measured and round-trips."""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'formats.json')
+            call_command('bench_formats', todos=20, repeat=1,
+                         output=output, stdout=StringIO())
+            with open(output) as f:
+                results = json.load(f)
+
+        self.assertEqual(list(results), [fmt.name for fmt in FORMATS])
+        self.assertEqual(results['json']['relative_size'], 1)
+        self.assertLess(results['msgpack_columnar']['bytes'],
+                        results['json']['bytes'])
@@ -0,0 +1,66 @@
+"""
+Tests for the password hashers.
+"""
+import threading
+from io import StringIO
+
+from django.contrib.auth import authenticate, get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.hashers import POOL_THREAD_PREFIX, run_in_hashing_pool
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000,
+                   PASSWORD_SCRYPT_WORK_FACTOR=2 ** 4)
+class HasherTests(TestCase):
+    """Test configurable hashing costs and rehashing on login."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123')
+
+    def login(self):
+        return authenticate(username='user@example.com',
+                            password='testpass123')
+
+    def test_rehash_on_cost_change(self):
+        """Test a login rehashes a password hashed at an older cost."""
+        self.assertIn('$1000$', self.user.password)
+
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            user = self.login()
+
+        self.assertIn('$2000$', user.password)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, user.password)
+
+    def test_rehash_on_hasher_change(self):
+        """Test a login moves a password to the preferred hasher."""
+        with self.settings(PASSWORD_HASHERS=[
+                'core.hashers.ScryptPasswordHasher',
+                'core.hashers.PBKDF2PasswordHasher']):
+            user = self.login()
+            self.assertTrue(user.password.startswith('scrypt$'))
+            self.assertEqual(self.login(), user)
+
+    def test_hashing_runs_in_pool(self):
+        """Test hashing runs on pool threads, nested calls included."""
+        def thread_names():
+            return (threading.current_thread().name,
+                    run_in_hashing_pool(
+                        lambda: threading.current_thread().name))
+
+        outer, inner = run_in_hashing_pool(thread_names)
+
+        self.assertTrue(outer.startswith(POOL_THREAD_PREFIX))
+        self.assertEqual(inner, outer)
+
+    def test_bench_hashers(self):
+        """Test the benchmark reports each hasher."""
+        out = StringIO()
+
+        call_command('bench_hashers', logins=1, stdout=out)
+
+        self.assertIn('pbkdf2\t', out.getvalue())
+        self.assertIn('scrypt\t', out.getvalue())
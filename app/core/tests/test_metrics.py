@@ -0,0 +1,118 @@
+"""
+Tests for the Prometheus metrics.
+"""
+from prometheus_client import REGISTRY
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Todo
+
+
+METRICS_URL = reverse('metrics')
+
+
+def sample(name, **labels):
+    """Return the current value of a metric sample, or 0."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    """Test request instrumentation and the metrics endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123')
+        self.todo = Todo.objects.create(user=self.user, content='todo')
+        self.async_client.force_login(self.user)
+
+    def test_request_metrics(self):
+        """Test latency and queries are recorded per view."""
+        labels = {'view': 'todo:todo-list'}
+        count = sample('todo_http_request_duration_seconds_count',
+                       method='GET', status='200', **labels)
+        queries = sample('todo_db_queries_per_request_sum', **labels)
+        self.client.force_login(self.user)
+
+        self.client.get(reverse('todo:todo-list'))
+
+        self.assertEqual(
+            sample('todo_http_request_duration_seconds_count',
+                   method='GET', status='200', **labels), count + 1)
+        self.assertGreater(
+            sample('todo_db_queries_per_request_sum', **labels), queries)
+
+    async def test_async_request_metrics(self):
+        """Test queries run by async views are counted."""
+        labels = {'view': 'todo_async:todo-detail'}
+        queries = sample('todo_db_queries_per_request_sum', **labels)
+
+        res = await self.async_client.get(
+            reverse('todo_async:todo-detail', args=[self.todo.pk]))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertGreater(
+            sample('todo_db_queries_per_request_sum', **labels), queries)
+
+    def test_template_and_cache_metrics(self):
+        """Test template renders and list cache lookups are counted."""
+        template = sample('todo_template_render_seconds_count',
+                          template='todo/todos.html')
+        misses = sample('todo_cache_requests_total',
+                        cache='todo_list', result='miss')
+        self.client.force_login(self.user)
+
+        self.client.get(reverse('todo:todos'))
+
+        self.assertEqual(sample('todo_template_render_seconds_count',
+                                template='todo/todos.html'), template + 1)
+        self.assertEqual(sample('todo_cache_requests_total',
+                                cache='todo_list', result='miss'),
+                         misses + 1)
+
+    def test_auth_failures(self):
+        """Test failed logins and rejected requests are counted."""
+        logins = sample('todo_auth_failures_total', reason='login')
+        rejected = sample('todo_auth_failures_total', reason='status_401')
+
+        self.client.post(reverse('user:token'),
+                         {'email': 'user@example.com', 'password': 'bad'})
+        self.client.get(reverse('todo:todo-list'))
+
+        self.assertEqual(
+            sample('todo_auth_failures_total', reason='login'), logins + 1)
+        self.assertEqual(
+            sample('todo_auth_failures_total', reason='status_401'),
+            rejected + 1)
+
+    def test_metrics_endpoint(self):
+        """Test the endpoint exposes the metrics as text."""
+        self.client.get(reverse('todo:todo-list'))
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'todo_http_request_duration_seconds_bucket',
+                      res.content)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_token(self):
+        """Test the endpoint requires the token when one is set."""
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 403)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer nope')
+        self.assertEqual(res.status_code, 403)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(res.status_code, 200)
+
+    def test_metrics_endpoint_remote_client(self):
+        """Test remote clients are refused without a token configured."""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.7')
+
+        self.assertEqual(res.status_code, 403)
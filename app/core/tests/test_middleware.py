@@ -0,0 +1,195 @@
+"""
+Tests for the app middleware.
+"""
+import gzip
+import json
+from unittest.mock import patch
+
+import brotli
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from core import compression
+from core.middleware import QueryStats, count_queries
+from core.models import Todo
+
+
+@override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=1)
+class QueryInstrumentationMiddlewareTests(TestCase):
+    """Test the query instrumentation middleware."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123')
+        Todo.objects.create(user=self.user, content='todo')
+        self.client.force_login(self.user)
+
+    def test_server_timing_and_log(self):
+        """Test sampled requests report their queries."""
+        with self.assertLogs('core.queries', 'INFO') as logs:
+            res = self.client.get(reverse('todo:todo-list'))
+
+        self.assertRegex(res['Server-Timing'],
+                         r'^db;dur=[\d.]+;desc="\d+ queries"$')
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0]
+        self.assertEqual(record.view, 'todo:todo-list')
+        self.assertGreater(record.queries, 0)
+        self.assertIn('slowest_sql=', record.getMessage())
+
+    @override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_request(self):
+        """Test requests outside the sample are not instrumented."""
+        res = self.client.get(reverse('todo:todo-list'))
+
+        self.assertNotIn('Server-Timing', res)
+
+
+class AsyncMiddlewareTests(SimpleTestCase):
+    """Test async requests can run through the middleware on the loop."""
+
+    def test_middleware_async_capable(self):
+        """Test every middleware of the app serves async requests."""
+        for path in settings.MIDDLEWARE:
+            with self.subTest(middleware=path):
+                self.assertTrue(import_string(path).async_capable)
+
+
+class QueryStatsTests(TestCase):
+    """Test counting queries."""
+
+    def test_duplicates(self):
+        """Test repeated statements are counted as duplicates."""
+        with count_queries(QueryStats()) as stats, \
+                connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            for n in range(3):
+                cursor.execute('SELECT %s', [n])
+
+        self.assertEqual(stats.count, 4)
+        self.assertEqual(stats.duplicates, 2)
+        self.assertIn(stats.slowest[1], ['SELECT 1', 'SELECT %s'])
+
+
+class CompressionTests(TestCase):
+    """Test the accepted coding is chosen."""
+
+    def test_choose_coding(self):
+        """Test brotli is preferred unless the client ranks gzip higher."""
+        self.assertEqual(compression.choose_coding('gzip, deflate, br'),
+                         'br')
+        self.assertEqual(compression.choose_coding('br;q=0.5, gzip'),
+                         'gzip')
+        self.assertEqual(compression.choose_coding('gzip;q=0, *'), 'br')
+        self.assertIsNone(compression.choose_coding('br;q=0, identity'))
+        self.assertIsNone(compression.choose_coding(''))
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(TestCase):
+    """Test the compression middleware."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123')
+        Todo.objects.bulk_create(
+            Todo(user=self.user, content=f'todo {n}') for n in range(20))
+        self.client.force_login(self.user)
+
+    def test_compress_api_list(self):
+        """Test JSON lists are compressed with the accepted coding."""
+        plain = self.client.get(reverse('todo:todo-list'))
+
+        for coding, decompress in [('gzip', gzip.decompress),
+                                   ('br', brotli.decompress)]:
+            res = self.client.get(reverse('todo:todo-list'),
+                                  HTTP_ACCEPT_ENCODING=coding)
+
+            self.assertEqual(res['Content-Encoding'], coding)
+            self.assertIn('Accept-Encoding', res['Vary'])
+            self.assertEqual(res['ETag'], 'W/' + plain['ETag'])
+            self.assertEqual(decompress(res.content), plain.content)
+            self.assertEqual(int(res['Content-Length']), len(res.content))
+
+    def test_compress_htmx_page(self):
+        """Test the todo page is gzipped with random padding, uncached."""
+        with patch('core.compression.compress_cached') as cached:
+            responses = [
+                self.client.get('/todos/', HTTP_ACCEPT_ENCODING='br, gzip')
+                for _ in range(5)]
+        cached.assert_not_called()
+
+        for res in responses:
+            self.assertEqual(res['Content-Encoding'], 'gzip')
+            self.assertIn(b'todo 19', gzip.decompress(res.content))
+        self.assertGreater(len({len(res.content) for res in responses}), 1)
+
+        res = self.client.get('/todos/', HTTP_ACCEPT_ENCODING='br')
+        self.assertFalse(res.has_header('Content-Encoding'))
+
+    @override_settings(COMPRESSION_MIN_SIZE=10 ** 6)
+    def test_small_response_not_compressed(self):
+        """Test responses under the threshold are sent as they are."""
+        res = self.client.get(reverse('todo:todo-list'),
+                              HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertNotIn('Content-Encoding', res)
+        self.assertEqual(len(res.json()['results']), 20)
+
+    def test_compressed_body_cached_by_etag(self):
+        """Test an unchanged list is compressed once per coding."""
+        with patch('core.compression.compress',
+                   wraps=compression.compress) as patched:
+            first = self.client.get(reverse('todo:todo-list'),
+                                    HTTP_ACCEPT_ENCODING='gzip')
+            second = self.client.get(reverse('todo:todo-list'),
+                                     HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(patched.call_count, 1)
+            self.assertEqual(first.content, second.content)
+
+            Todo.objects.create(user=self.user, content='new')
+            third = self.client.get(reverse('todo:todo-list'),
+                                    HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(patched.call_count, 2)
+        self.assertIn(b'"new"', gzip.decompress(third.content))
+
+    def test_compressed_cache_keyed_by_body(self):
+        """Test different bodies never share a cached compressed copy."""
+        first = compression.compress_cached(b'a' * 200, 'gzip')
+        second = compression.compress_cached(b'b' * 200, 'gzip')
+
+        self.assertEqual(gzip.decompress(first), b'a' * 200)
+        self.assertEqual(gzip.decompress(second), b'b' * 200)
+
+    async def test_compress_async_view(self):
+        """Test async requests are compressed on the async path."""
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+        res = await self.async_client.get(
+            reverse('todo_async:todo-list'),
+            headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertIn(b'todo 19', gzip.decompress(res.content))
+
+    def test_streaming_response_compressed(self):
+        """Test streaming exports are compressed as they stream."""
+        for coding, decompress in [('gzip', gzip.decompress),
+                                   ('br', brotli.decompress)]:
+            res = self.client.get(reverse('todo:todo-export'),
+                                  {'format': 'ndjson'},
+                                  HTTP_ACCEPT_ENCODING=coding)
+
+            self.assertEqual(res['Content-Encoding'], coding)
+            lines = decompress(
+                b''.join(res.streaming_content)).splitlines()
+            self.assertEqual(len(lines), 20)
+            self.assertEqual(json.loads(lines[0])['content'], 'todo 0')
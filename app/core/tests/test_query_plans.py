@@ -0,0 +1,148 @@
+"""
+Tests for the query plans of todo access paths.
+"""
+import datetime
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core.models import Todo
+from todo.filters import ORDERINGS
+
+
+TODOS_PER_USER = 200
+
+SORT_NODE = re.compile(r'^\s*(->\s+)?(Incremental )?Sort\b', re.MULTILINE)
+
+
+def explain(sql):
+    """Return the text query plan for a SQL statement."""
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN ' + sql)
+        return '\n'.join(row[0] for row in cursor.fetchall())
+
+
+class QueryPlanTests(TestCase):
+    """Test todo queries are served by indexes.
+
+    Sequential scans and sorts are disabled for the planner, which then
+    only picks them when no index can answer the query, so either node
+    in a plan means an access path lost its index.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        users = [
+            get_user_model().objects.create_user(
+                email=f'user{i}@example.com', password='testpass123')
+            for i in range(3)
+        ]
+        Todo.objects.bulk_create(
+            Todo(
+                user=user,
+                content=f'todo {n}',
+                status=n % 3 == 0,
+                priority=n % 5 == 0,
+                due_date=now + datetime.timedelta(days=n % 30 - 15),
+            )
+            for user in users
+            for n in range(TODOS_PER_USER)
+        )
+        cls.user = users[0]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_todo')
+
+    def setUp(self):
+        cache.clear()
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+            cursor.execute('SET enable_sort = off')
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_seqscan')
+            cursor.execute('RESET enable_sort')
+
+    def assertIndexedPlan(self, plan):
+        """Assert a query plan has no sequential scan or sort."""
+        self.assertNotIn('Seq Scan', plan, msg=plan)
+        self.assertIsNone(SORT_NODE.search(plan), msg=plan)
+
+    def assertViewQueriesIndexed(self, client, url, params=None):
+        """Assert every todo query a view runs plans against an index."""
+        with CaptureQueriesContext(connection) as ctx:
+            res = client.get(url, params)
+        self.assertEqual(res.status_code, 200)
+
+        statements = [q['sql'] for q in ctx.captured_queries
+                      if '"core_todo"' in q['sql']]
+        self.assertTrue(statements)
+        for sql in statements:
+            self.assertIndexedPlan(explain(sql))
+
+    def test_todo_api_list_plan(self):
+        """Test the paginated API list uses the created_at index."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('todo:todo-list')
+
+        self.assertViewQueriesIndexed(client, url)
+        res = client.get(url, {'limit': 10})
+        self.assertViewQueriesIndexed(client, res.data['next'])
+
+    def test_todo_api_ordering_plans(self):
+        """Test each API ordering pages through an index."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('todo:todo-list')
+
+        for ordering in ORDERINGS:
+            with self.subTest(ordering=ordering):
+                params = {'ordering': ordering, 'limit': 10}
+                self.assertViewQueriesIndexed(client, url, params)
+                res = client.get(url, params)
+                self.assertViewQueriesIndexed(client, res.data['next'])
+
+    def test_list_todos_plan(self):
+        """Test the htmx todo page uses the created_at index."""
+        self.client.force_login(self.user)
+
+        self.assertViewQueriesIndexed(self.client, reverse('todo:todos'))
+
+    def test_home_plan(self):
+        """Test the home queryset uses the created_at index."""
+        todos = Todo.objects.filter(user=self.user).order_by('created_at')
+
+        self.assertIndexedPlan(todos.explain())
+
+    def test_status_plan(self):
+        """Test filtering by status uses the status index."""
+        todos = Todo.objects.filter(user=self.user, status=True)
+
+        self.assertIndexedPlan(todos.explain())
+
+    def test_priority_due_date_plan(self):
+        """Test priority todos ordered by due date use the priority index."""
+        todos = Todo.objects.filter(
+            user=self.user, priority=True).order_by('due_date')
+
+        self.assertIndexedPlan(todos.explain())
+
+    def test_overdue_plan(self):
+        """Test open todos past their due date use the partial index."""
+        todos = Todo.objects.filter(
+            user=self.user,
+            status=False,
+            due_date__lt=timezone.now(),
+        ).order_by('due_date')
+
+        self.assertIndexedPlan(todos.explain())
@@ -0,0 +1,114 @@
+"""
+Tests for the API renderers and parsers.
+"""
+import datetime
+import io
+
+import msgpack
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+
+from core.parsers import JSONParser, MessagePackParser, from_columnar
+from core.renderers import (
+    FastJSONRenderer,
+    MessagePackRenderer,
+    is_columnar,
+    to_columnar,
+)
+
+
+TODOS = [
+    {'id': 1, 'content': 'a', 'status': True},
+    {'id': 2, 'content': 'b', 'status': False},
+]
+
+
+class ColumnarTests(SimpleTestCase):
+    """Test the columnar layout."""
+
+    def test_is_columnar(self):
+        """Test the layout is read from the media type parameters."""
+        self.assertTrue(is_columnar('application/json; layout=columnar'))
+        self.assertTrue(is_columnar('application/msgpack;layout="columnar"'))
+        self.assertFalse(is_columnar('application/json'))
+        self.assertFalse(is_columnar(None))
+
+    def test_round_trip(self):
+        """Test paginated and plain lists round-trip."""
+        page = {'next': None, 'previous': None, 'results': TODOS}
+        columnar = to_columnar(page)
+
+        self.assertEqual(columnar['results'], {
+            'fields': ['id', 'content', 'status'],
+            'rows': [[1, 'a', True], [2, 'b', False]],
+        })
+        self.assertEqual(from_columnar(columnar), page)
+        self.assertEqual(from_columnar(to_columnar(TODOS)), TODOS)
+        self.assertEqual(from_columnar(to_columnar([])), [])
+
+    def test_left_as_is(self):
+        """Test data without lists of like objects is not changed."""
+        mixed = [{'id': 1}, {'id': 2, 'content': 'b'}]
+
+        self.assertEqual(to_columnar(mixed), mixed)
+        self.assertEqual(to_columnar({'name': 'x'}), {'name': 'x'})
+        self.assertEqual(from_columnar({'name': 'x'}), {'name': 'x'})
+
+    def test_invalid_rows(self):
+        """Test rows not matching the fields are refused."""
+        with self.assertRaises(ParseError):
+            from_columnar({'fields': ['id'], 'rows': [[1, 2]]})
+
+
+class MessagePackTests(SimpleTestCase):
+    """Test MessagePack rendering and parsing."""
+
+    def test_render_and_parse(self):
+        """Test data round-trips, columnar or not."""
+        data = {'detail': _('Not found.'), 'results': TODOS}
+        for media_type in ['application/msgpack',
+                           'application/msgpack; layout=columnar']:
+            body = MessagePackRenderer().render(data, media_type)
+            parsed = MessagePackParser().parse(io.BytesIO(body), media_type)
+
+            self.assertEqual(parsed, {**data, 'detail': 'Not found.'})
+
+        self.assertLess(
+            len(MessagePackRenderer().render(
+                data, 'application/msgpack; layout=columnar')),
+            len(FastJSONRenderer().render(data, 'application/json')))
+
+    def test_parse_invalid(self):
+        """Test malformed MessagePack is a parse error."""
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\xc1'))
+
+    def test_parse_unhashable_key(self):
+        """Test a map keyed by an array is a parse error."""
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\x81\x91\x01\x01'))
+
+    def test_parse_ext_type(self):
+        """Test extension types are refused and timestamps decoded."""
+        body = msgpack.packb({'content': msgpack.ExtType(1, b'x')})
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(body))
+
+        moment = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        body = msgpack.packb({'due_date': moment}, datetime=True)
+        self.assertEqual(MessagePackParser().parse(io.BytesIO(body)),
+                         {'due_date': moment})
+
+    def test_json_parser_columnar(self):
+        """Test columnar JSON bodies are parsed into objects."""
+        body = FastJSONRenderer().render(TODOS, 'application/json; '
+                                                'layout=columnar')
+
+        self.assertEqual(
+            JSONParser().parse(io.BytesIO(body),
+                               'application/json; layout=columnar'),
+            TODOS)
+        self.assertEqual(msgpack.unpackb(
+            MessagePackRenderer().render(TODOS, 'application/msgpack')),
+            TODOS)
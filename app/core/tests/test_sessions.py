@@ -0,0 +1,45 @@
+"""
+Tests for the coalescing session engines.
+"""
+from importlib import import_module
+
+from django.test import TestCase
+
+
+ENGINES = ['core.sessions.db', 'core.sessions.cache',
+           'core.sessions.cached_db']
+
+
+class CoalescingSessionTests(TestCase):
+    """Test sessions are only written when their data changes."""
+
+    def get_store(self, engine, session_key=None):
+        return import_module(engine).SessionStore(session_key)
+
+    def test_unchanged_session_not_saved(self):
+        """Test assigning the same value does not write the session."""
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                session = self.get_store(engine)
+                session['key'] = 'value'
+                session.save()
+
+                session = self.get_store(engine, session.session_key)
+                session['key'] = 'value'
+                with self.assertNumQueries(0):
+                    session.save()
+
+    def test_changed_session_saved(self):
+        """Test changed data is written and read back."""
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                session = self.get_store(engine)
+                session['key'] = 'value'
+                session.save()
+
+                session = self.get_store(engine, session.session_key)
+                session['key'] = 'changed'
+                session.save()
+
+                session = self.get_store(engine, session.session_key)
+                self.assertEqual(session['key'], 'changed')
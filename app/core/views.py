@@ -1,9 +1,17 @@
 """
 Views for the todo APIs
 """
+import hmac
+import ipaddress
+
+from django.conf import settings
 from django.shortcuts import redirect
+from core.metrics import render_metrics
 from core.models import Todo
-from django.http import Http404
+from todo.cache import get_todo_page
+from todo.conditional import collection_condition
+from todo.stats import get_todo_stats
+from django.http import Http404, HttpResponse, HttpResponseForbidden
 
 from django.shortcuts import render
 
@@ -11,15 +19,41 @@ from django.shortcuts import render
 def home(request):
     if not request.user.is_authenticated:
         return redirect('/login')
+    return _home(request)
+
+
+@collection_condition
+def _home(request):
     try:
         # todos = Todo.objects.all().order_by('created_at')
-        todos = Todo.objects.all().filter(
-            user=request.user).order_by('created_at')
-        todo_count = todos.count()
+        page = get_todo_page(request)
+        stats = get_todo_stats(request.user)
     except Todo.DoesNotExist:
         raise Http404("not exist")
     context = {
-        'todos': todos,
-        'todo_count': todo_count
+        **page,
+        'todo_count': stats['total'],
+        'stats': stats,
     }
     return render(request, 'index.html', context)
+
+
+def metrics_allowed(request):
+    """Return whether a request may read the metrics."""
+    if settings.METRICS_TOKEN:
+        return hmac.compare_digest(
+            request.META.get('HTTP_AUTHORIZATION', '').encode(),
+            f'Bearer {settings.METRICS_TOKEN}'.encode(),
+        )
+    try:
+        return ipaddress.ip_address(request.META['REMOTE_ADDR']).is_loopback
+    except (KeyError, ValueError):
+        return False
+
+
+def metrics(request):
+    """Expose Prometheus metrics to the scraper."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration for serving the app in production.
+
+Run with `gunicorn` from the project directory. SERVER_MODE=asgi serves
+app.asgi through uvicorn workers instead of app.wsgi.
+"""
+import multiprocessing
+import os
+
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# The usual (2 x cores) + 1 keeps every core busy while some workers
+# wait on Postgres.
+workers = int(os.environ.get('WEB_CONCURRENCY') or
+              multiprocessing.cpu_count() * 2 + 1)
+# Workers size their password hashing pools from it.
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+if server_mode == 'asgi':
+    wsgi_app = 'app.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'app.wsgi:application'
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Recycle workers now and then to bound memory growth, staggered so they
+# do not all restart at once.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the shared metrics."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TodoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'todo'
+
+    def ready(self):
+        from todo import signals  # noqa
@@ -0,0 +1,21 @@
+"""
+URL mappings for the async todo views.
+"""
+from django.urls import path
+
+from todo import async_views
+
+
+app_name = 'todo_async'
+
+urlpatterns = [
+    path('', async_views.list_todos, name="todos"),
+    path('create_todo/', async_views.create_todo, name="create_todo"),
+    path('delete_todo/<int:pk>/', async_views.delete_todo,
+         name="delete_todo"),
+    path('update_todo/<int:pk>/', async_views.update_todo,
+         name="update_todo"),
+    path('stats/', async_views.todo_stats, name="todo_stats"),
+    path('todos/', async_views.api_list_todos, name="todo-list"),
+    path('todos/<int:pk>/', async_views.api_todo_detail, name="todo-detail"),
+]
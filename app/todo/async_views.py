@@ -0,0 +1,168 @@
+"""
+Async views for the todo app.
+
+These mirror the htmx views and the read-only todo API with Django's
+async ORM. They are mounted under /async/.
+
+Django 4.2 has no async database driver: the async ORM runs each query
+through sync_to_async, so a request still holds a worker thread while it
+waits on Postgres. What these views save is the rest of the request,
+which stays on the event loop as long as the middleware chain is async
+capable, as the app's middleware is.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+
+from django.contrib.auth.views import redirect_to_login
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+)
+from django.shortcuts import render
+
+from core.models import Todo
+from todo import serializers, writes
+from todo.filters import (
+    TodoFilterBackend,
+    TodoFilterSerializer,
+    TodoPageFilterBackend,
+)
+from todo.pagination import TodoCursorPagination, TodoPagePagination
+from todo.stats import aget_todo_stats
+from todo.views import TodoViewSet
+
+
+async def aget_user(request):
+    """Return the request user without blocking the event loop."""
+    auser = getattr(request, 'auser', None)
+    if auser is not None:
+        return await auser()
+
+    # Served through sync middleware, where request.user is still lazy.
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def async_login_required(methods, api=False):
+    """Restrict an async view to logged in users and the given methods."""
+    def decorator(view_func):
+        @wraps(view_func)
+        async def inner(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+
+            user = await aget_user(request)
+            if not user.is_authenticated:
+                if api:
+                    return JsonResponse({
+                        'detail': 'Authentication credentials were not '
+                                  'provided.'
+                    }, status=403)
+                return redirect_to_login(
+                    request.get_full_path(), login_url='/user/login')
+
+            return await view_func(request, *args, **kwargs)
+
+        return inner
+
+    return decorator
+
+
+@async_login_required(['GET'])
+async def list_todos(request):
+    filters = TodoFilterSerializer(data=request.GET.dict())
+    if not filters.is_valid():
+        return HttpResponseBadRequest()
+
+    drf_request = Request(request)
+    paginator = TodoPagePagination()
+    queryset = TodoPageFilterBackend().filter_queryset(
+        drf_request, Todo.objects.filter(user=request.user), None)
+    try:
+        queryset = paginator.get_page_queryset(queryset, drf_request)
+    except NotFound:
+        raise Http404('Invalid cursor')
+    page = {
+        'todos': paginator.set_page([todo async for todo in queryset]),
+        'next': paginator.get_next_link(),
+    }
+
+    if request.headers.get('HX-Request'):
+        return render(request, "todo/partials/todo_list.html", page)
+
+    stats = await aget_todo_stats(request.user)
+    return render(request, "todo/todos.html", {**page, "stats": stats})
+
+
+@async_login_required(['GET'])
+async def todo_stats(request):
+    stats = await aget_todo_stats(request.user)
+    return render(request, "todo/partials/stats.html", {"stats": stats})
+
+
+@async_login_required(['POST'])
+async def create_todo(request):
+    content = request.POST.get("content", "")
+    if not content:
+        return HttpResponseBadRequest()
+
+    todo = await Todo.objects.acreate(
+        user=request.user, content=content, status=False)
+
+    response = render(request, "todo/partials/todo.html", {"todo": todo})
+    response['HX-Trigger'] = 'todosChanged'
+    return response
+
+
+@async_login_required(['PUT'])
+async def update_todo(request, pk):
+    todo = await sync_to_async(writes.toggle_todo)(request.user, pk)
+    if todo is None:
+        raise Http404('not exist')
+
+    response = render(request, "todo/partials/todo.html", {"todo": todo})
+    response['HX-Trigger'] = 'todosChanged'
+    return response
+
+
+@async_login_required(['DELETE'])
+async def delete_todo(request, pk):
+    if not await sync_to_async(writes.delete_todo)(request.user, pk):
+        raise Http404('not exist')
+
+    return HttpResponse(headers={'HX-Trigger': 'todosChanged'})
+
+
+@async_login_required(['GET'], api=True)
+async def api_list_todos(request):
+    """List todos with the filters and pagination of TodoViewSet."""
+    drf_request = Request(request)
+    paginator = TodoCursorPagination()
+    try:
+        queryset = TodoFilterBackend().filter_queryset(
+            drf_request, Todo.objects.filter(user=request.user), TodoViewSet)
+        queryset = paginator.get_page_queryset(
+            queryset, drf_request, TodoViewSet)
+    except APIException as exc:
+        return JsonResponse(exc.detail, status=exc.status_code, safe=False)
+
+    page = paginator.set_page([todo async for todo in queryset])
+    data = serializers.TodoSerializer(page, many=True).data
+    return JsonResponse(paginator.get_paginated_response(data).data)
+
+
+@async_login_required(['GET'], api=True)
+async def api_todo_detail(request, pk):
+    """Retrieve a todo like TodoViewSet.retrieve."""
+    try:
+        todo = await Todo.objects.aget(pk=pk, user=request.user)
+    except Todo.DoesNotExist:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    return JsonResponse(serializers.TodoDetailSerializer(todo).data)
@@ -0,0 +1,103 @@
+"""
+Per-user caching of todo lists.
+
+Every cached list is stored under a key that embeds the user's current
+list version, so a write only has to bump the version to make all of the
+user's cached lists unreachable; the stale entries then expire on their
+own.
+"""
+import hashlib
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.request import Request
+
+from core.metrics import CACHE_REQUESTS
+from core.models import Todo
+from todo.conditional import collection_cache_name
+from todo.filters import TodoPageFilterBackend
+from todo.pagination import TodoPagePagination
+from todo.serializers import TodoSerializer, serialize_todo_rows
+
+
+LIST_VERSION_KEY = 'todo:list-version:{user_id}'
+LIST_KEY = 'todo:list:{user_id}:{version}:{name}'
+
+
+def get_list_version(user_id):
+    """Return the current todo list version of a user."""
+    key = LIST_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_list_version(user_id):
+    """Make every cached todo list of a user stale."""
+    cache.set(LIST_VERSION_KEY.format(user_id=user_id), time.time_ns(), None)
+
+
+def invalidate_todo_list(user_id):
+    """Invalidate the cached todo lists of a user after a write.
+
+    The version is bumped right away and again once the transaction
+    commits, so a concurrent read that repopulated the cache with
+    uncommitted-state data in between is discarded as well.
+    """
+    bump_list_version(user_id)
+    transaction.on_commit(partial(bump_list_version, user_id))
+
+
+def get_list_cache_key(user_id, name):
+    """Return the versioned cache key of a named list of a user.
+
+    Names embed request URLs, search text and cursor included, so they
+    are hashed to keep keys within memcached's 250 characters.
+    """
+    digest = hashlib.blake2b(name.encode(), digest_size=16).hexdigest()
+    return LIST_KEY.format(
+        user_id=user_id, version=get_list_version(user_id), name=digest)
+
+
+def get_or_set_list(user_id, name, default):
+    """Return a cached list of a user, computing it with default on a miss."""
+    key = get_list_cache_key(user_id, name)
+    data = cache.get(key)
+    if data is None:
+        CACHE_REQUESTS.labels('todo_list', 'miss').inc()
+        data = default()
+        cache.set(key, data)
+    else:
+        CACHE_REQUESTS.labels('todo_list', 'hit').inc()
+
+    return data
+
+
+def get_todo_page(request):
+    """Return a page of the user's todos for the htmx views.
+
+    Pages are cached per URL, cursor included, like TodoViewSet.list, so
+    no cache value grows with the size of the list. Returns the
+    serialized todos and the link to the next page. Raises DRF's
+    ValidationError for invalid filters and NotFound for an invalid
+    cursor.
+    """
+    def load():
+        drf_request = Request(request)
+        queryset = TodoPageFilterBackend().filter_queryset(
+            drf_request, Todo.objects.filter(user=request.user), None)
+        paginator = TodoPagePagination()
+        page = paginator.paginate_queryset(
+            queryset.values(*TodoSerializer.Meta.fields), drf_request)
+        return {
+            'todos': serialize_todo_rows(page),
+            'next': paginator.get_next_link(),
+        }
+
+    return get_or_set_list(
+        request.user.pk, collection_cache_name(request), load)
@@ -0,0 +1,141 @@
+"""
+Conditional request support for todo views.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from core.models import Todo, TodoTombstone
+
+
+def get_collection_state(request):
+    """Return the todo count and last change time of the request user.
+
+    Besides writes, a todo changes the collection when its due date
+    passes, since that moves the overdue counters and filters; the last
+    change is the latest of the updates, the deletes recorded as
+    tombstones and the passed due dates of active todos. The state is
+    computed with one aggregate query and kept on the request, since
+    both the ETag and Last-Modified are derived from it.
+    """
+    state = getattr(request, '_todo_collection_state', None)
+    if state is None:
+        last_deleted = TodoTombstone.objects.filter(
+            user=OuterRef('user')).order_by('-deleted_at').values(
+            'deleted_at')[:1]
+        state = Todo.objects.filter(user=request.user).aggregate(
+            count=Count('id'),
+            last_updated=Max('updated_at'),
+            last_overdue=Max('due_date', filter=Q(
+                status=False, due_date__lt=timezone.now())),
+            last_deleted=Max(Subquery(last_deleted)),
+        )
+        changes = [state['last_updated'], state['last_overdue'],
+                   state['last_deleted']]
+        state['last_modified'] = max(
+            [change for change in changes if change is not None],
+            default=None)
+        request._todo_collection_state = state
+
+    return state
+
+
+def collection_etag(request, *args, **kwargs):
+    """Return the ETag of a todo collection response.
+
+    Any write moves either the count or the latest updated_at, and a
+    todo becoming overdue moves the latest passed due date. The
+    requested URL, media type and htmx partial flag are mixed in because
+    each page and format of the collection is a separate representation,
+    and so is the CSRF token, which HTML pages embed.
+    """
+    state = get_collection_state(request)
+    key = '{}:{}:{}:{}:{}:{}:{}:{}'.format(
+        request.user.pk,
+        state['count'],
+        state['last_updated'] and state['last_updated'].isoformat(),
+        state['last_overdue'] and state['last_overdue'].isoformat(),
+        request.build_absolute_uri(),
+        request.META.get('HTTP_ACCEPT', ''),
+        request.META.get('HTTP_HX_REQUEST', ''),
+        request.META.get('CSRF_COOKIE', ''),
+    )
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def collection_cache_name(request):
+    """Return the name a todo collection response is cached under.
+
+    Writes invalidate the cached lists, but a todo becoming overdue does
+    not, so the latest passed due date is part of the name.
+    """
+    last_overdue = get_collection_state(request)['last_overdue']
+    return '{}:{}'.format(
+        request.build_absolute_uri(),
+        last_overdue and last_overdue.isoformat(),
+    )
+
+
+def collection_last_modified(request, *args, **kwargs):
+    """Return the Last-Modified time of a todo collection response.
+
+    Deletes move it through their tombstones; once the last todo is
+    deleted there is none, so no If-Modified-Since request gets a 304.
+    """
+    return get_collection_state(request)['last_modified']
+
+
+def todo_etag(request, todo):
+    """Return the ETag of a single todo response.
+
+    As for collections, the URL and media type are mixed in, since each
+    format of the todo is a separate representation.
+    """
+    key = '{}:{}:{}:{}'.format(
+        todo.pk,
+        todo.updated_at.isoformat(),
+        request.build_absolute_uri(),
+        request.META.get('HTTP_ACCEPT', ''),
+    )
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def collection_condition(view_func):
+    """Decorate a view of the user's todos with conditional GET support.
+
+    Matching If-None-Match/If-Modified-Since requests get a 304 before
+    the view runs, and every response is marked for revalidation.
+    """
+    conditional_view = condition(
+        etag_func=collection_etag,
+        last_modified_func=collection_last_modified,
+    )(view_func)
+
+    @wraps(view_func)
+    def inner(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return inner
+
+
+def todo_conditional_response(request, todo, get_response):
+    """Return a response for a single todo, or a 304 if it is unchanged."""
+    etag = quote_etag(todo_etag(request, todo))
+    last_modified = int(todo.updated_at.timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = get_response()
+    if request.method in ('GET', 'HEAD'):
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    patch_cache_control(response, private=True, no_cache=True)
+
+    return response
@@ -0,0 +1,70 @@
+"""
+Streaming export of todos.
+
+Rows are read with a server-side cursor in chunks and written out as
+they arrive, without model instances or DRF fields, so memory stays
+flat however many todos a user has. Under ASGI the stream has to be
+an async iterator, which Django sends as it goes; it reads a sync one
+into a list first.
+"""
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from todo.renderers import dumps
+from todo.serializers import TodoSerializer, serialize_todo_rows
+
+
+EXPORT_FIELDS = TodoSerializer.Meta.fields
+
+
+def export_rows(queryset, chunk_size):
+    """Yield lists of serialized todos, chunk_size rows at a time."""
+    rows = queryset.values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield serialize_todo_rows(chunk)
+
+
+def stream_ndjson(queryset, chunk_size):
+    """Yield todos as newline-delimited JSON."""
+    for chunk in export_rows(queryset, chunk_size):
+        yield b''.join(dumps(row) + b'\n' for row in chunk)
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, chunk_size):
+    """Yield todos as CSV, starting with the header row."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for chunk in export_rows(queryset, chunk_size):
+        yield ''.join(
+            writer.writerow([row[field] for field in EXPORT_FIELDS])
+            for row in chunk)
+
+
+async def aiterate(chunks):
+    """Yield the chunks of a sync stream, each read in the request's thread.
+
+    Reading on the thread the view ran on keeps the server-side cursor
+    on its database connection.
+    """
+    chunks = iter(chunks)
+    end = object()
+    try:
+        while True:
+            chunk = await sync_to_async(next)(chunks, end)
+            if chunk is end:
+                break
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
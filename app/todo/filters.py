@@ -0,0 +1,109 @@
+"""
+Filters for todo APIs.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+
+SEARCH_CONFIG = 'english'
+
+# Each ordering ends with a unique column so keyset pagination is total,
+# and matches one of the (user, ...) indexes on core.Todo.
+ORDERINGS = {
+    'created_at': ('created_at', 'id'),
+    '-created_at': ('-created_at', '-id'),
+    'due_date': ('due_date', 'id'),
+    '-due_date': ('-due_date', '-id'),
+    'priority': ('priority', 'due_date', 'id'),
+    '-priority': ('-priority', '-due_date', '-id'),
+}
+
+
+def search_vector():
+    """Return the search vector of todo content.
+
+    It must stay identical to the expression of the GIN index on
+    core.Todo for the index to be used.
+    """
+    return SearchVector('content', config=SEARCH_CONFIG)
+
+
+class TodoFilterSerializer(serializers.Serializer):
+    """Serializer for todo list query parameters."""
+    status = serializers.BooleanField(required=False)
+    priority = serializers.BooleanField(required=False)
+    due_after = serializers.DateTimeField(required=False)
+    due_before = serializers.DateTimeField(required=False)
+    overdue = serializers.BooleanField(required=False)
+    search = serializers.CharField(required=False, max_length=255)
+    ordering = serializers.ChoiceField(
+        choices=list(ORDERINGS), required=False)
+
+
+def filter_todos(queryset, filters):
+    """Return the todos matching validated TodoFilterSerializer data."""
+    if 'status' in filters:
+        queryset = queryset.filter(status=filters['status'])
+    if 'priority' in filters:
+        queryset = queryset.filter(priority=filters['priority'])
+    if 'due_after' in filters:
+        queryset = queryset.filter(due_date__gte=filters['due_after'])
+    if 'due_before' in filters:
+        queryset = queryset.filter(due_date__lt=filters['due_before'])
+    if 'overdue' in filters:
+        overdue = Q(status=False, due_date__lt=timezone.now())
+        queryset = queryset.filter(overdue if filters['overdue'] else ~overdue)
+    if filters.get('search'):
+        queryset = queryset.annotate(search=search_vector()).filter(
+            search=SearchQuery(filters['search'], config=SEARCH_CONFIG,
+                               search_type='websearch'))
+
+    return queryset
+
+
+class TodoFilterBackend(BaseFilterBackend):
+    """Filter, search and order todos from query parameters."""
+    default_ordering = 'created_at'
+
+    def get_filters(self, request):
+        """Return the validated filter query parameters."""
+        serializer = TodoFilterSerializer(data=request.query_params.dict())
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering fields requested with ?ordering=."""
+        name = request.query_params.get('ordering', self.default_ordering)
+        return ORDERINGS.get(name, ORDERINGS[self.default_ordering])
+
+    def filter_queryset(self, request, queryset, view):
+        queryset = filter_todos(queryset, self.get_filters(request))
+        return queryset.order_by(
+            *self.get_ordering(request, queryset, view))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': name,
+                'required': False,
+                'in': 'query',
+                'schema': schema,
+            }
+            for name, schema in [
+                ('status', {'type': 'boolean'}),
+                ('priority', {'type': 'boolean'}),
+                ('due_after', {'type': 'string', 'format': 'date-time'}),
+                ('due_before', {'type': 'string', 'format': 'date-time'}),
+                ('overdue', {'type': 'boolean'}),
+                ('search', {'type': 'string'}),
+                ('ordering', {'type': 'string', 'enum': list(ORDERINGS)}),
+            ]
+        ]
+
+
+class TodoPageFilterBackend(TodoFilterBackend):
+    """Filter backend of the htmx todo pages, which list newest first."""
+    default_ordering = '-created_at'
@@ -0,0 +1,293 @@
+"""
+Bulk import of todos from NDJSON or CSV.
+
+Input is read line by line and handled in batches: each batch is
+validated with plain Python checks, much cheaper than a serializer per
+row, and loaded with a single COPY (or multi-row INSERT) in its own
+transaction. Invalid rows are skipped and reported with their line
+number; the valid rows of the batch are still loaded.
+"""
+import csv
+import io
+import json
+import re
+from collections import namedtuple
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from core.models import Todo
+from todo.cache import invalidate_todo_list
+
+
+COPY = 'copy'
+BULK_CREATE = 'bulk_create'
+METHODS = [COPY, BULK_CREATE]
+
+IMPORT_COLUMNS = ['user_id', 'content', 'status', 'due_date', 'priority',
+                  'created_at', 'updated_at']
+
+CONTENT_MAX_LENGTH = Todo._meta.get_field('content').max_length
+SURROGATES = re.compile('[\ud800-\udfff]')
+TRUE_VALUES = serializers.BooleanField.TRUE_VALUES
+FALSE_VALUES = serializers.BooleanField.FALSE_VALUES
+
+
+# Stands in for the row of a line that could not be read.
+InvalidLine = namedtuple('InvalidLine', ['error'])
+
+
+class LineDecoder:
+    """Iterate over lines of bytes or text as text, dropping a leading BOM.
+
+    A line that is not valid UTF-8 comes out blank, which the readers
+    skip, and its number is kept so they can report it.
+    """
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.number = 0
+        self.invalid = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self.lines)
+        self.number += 1
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError:
+                self.invalid.append(self.number)
+                return '\n'
+        if self.number == 1:
+            line = line.lstrip('\ufeff')
+        return line
+
+    def pop_invalid(self):
+        """Return (line number, InvalidLine) for lines not decoded yet."""
+        invalid = [(number, InvalidLine('Invalid UTF-8.'))
+                   for number in self.invalid]
+        self.invalid = []
+        return invalid
+
+
+def read_ndjson(lines):
+    """Yield (line number, value) for each non-blank NDJSON line.
+
+    Lines that cannot be decoded or parsed give an InvalidLine.
+    """
+    decoder = LineDecoder(lines)
+    for number, line in enumerate(decoder, 1):
+        yield from decoder.pop_invalid()
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except (ValueError, RecursionError):
+            yield number, InvalidLine('Invalid JSON.')
+
+
+def read_csv(lines):
+    """Yield (line number, row) for each CSV record after the header.
+
+    Records that cannot be decoded or parsed give an InvalidLine.
+    """
+    decoder = LineDecoder(lines)
+    reader = csv.DictReader(decoder)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as exc:
+            row = InvalidLine(f'Invalid CSV: {exc}.')
+        yield from decoder.pop_invalid()
+        yield decoder.number, row
+
+    yield from decoder.pop_invalid()
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+def parse_bool(value, default):
+    """Return value as a bool, like serializers.BooleanField."""
+    if value is None or value == '':
+        return default
+    try:
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+    except TypeError:
+        pass
+    raise ValueError('Must be a valid boolean.')
+
+
+def parse_due_date(value):
+    """Return value as an aware datetime, or None if blank."""
+    if value is None or value == '':
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except (TypeError, ValueError):
+        parsed = None
+    if parsed is None:
+        raise ValueError('Datetime has wrong format.')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def get_text_error(value):
+    """Return why Postgres would refuse a string, like DRF's CharField.
+
+    Text columns cannot hold NUL, and lone surrogates cannot be encoded
+    as UTF-8; either would fail the whole COPY.
+    """
+    if '\x00' in value:
+        return 'Null characters are not allowed.'
+    surrogate = SURROGATES.search(value)
+    if surrogate:
+        return ('Surrogate characters are not allowed: '
+                f'U+{ord(surrogate.group()):X}.')
+    return None
+
+
+FIELD_PARSERS = [
+    ('status', partial(parse_bool, default=True)),
+    ('priority', partial(parse_bool, default=False)),
+    ('due_date', parse_due_date),
+]
+
+
+def clean_batch(rows):
+    """Validate a batch of (line number, row) pairs.
+
+    Returns the values of the valid rows as (content, status, due_date,
+    priority) tuples and the errors of the others.
+    """
+    records, errors = [], []
+    for number, row in rows:
+        if isinstance(row, InvalidLine):
+            errors.append({'line': number, 'errors': {
+                'non_field_errors': [row.error]}})
+            continue
+        if not isinstance(row, dict):
+            errors.append({'line': number, 'errors': {
+                'non_field_errors': ['Expected an object.']}})
+            continue
+
+        row_errors = {}
+        content = row.get('content')
+        if not isinstance(content, str) or not content.strip():
+            row_errors['content'] = ['This field is required.']
+        else:
+            content = content.strip()
+            content_error = get_text_error(content)
+            if content_error:
+                row_errors['content'] = [content_error]
+            elif len(content) > CONTENT_MAX_LENGTH:
+                row_errors['content'] = [
+                    'Ensure this field has no more than '
+                    f'{CONTENT_MAX_LENGTH} characters.']
+
+        values = {}
+        for field, parse in FIELD_PARSERS:
+            try:
+                values[field] = parse(row.get(field))
+            except ValueError as exc:
+                row_errors[field] = [str(exc)]
+
+        if row_errors:
+            errors.append({'line': number, 'errors': row_errors})
+        else:
+            records.append((content, values['status'], values['due_date'],
+                            values['priority']))
+
+    return records, errors
+
+
+def copy_todos(user_id, records):
+    """Insert todo records for a user with Postgres COPY."""
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    # Formatted once rather than per row, which is most of the cost.
+    now = timezone.now().isoformat()
+    buffer = io.StringIO()
+    # Blank unquoted fields are NULL in COPY's CSV format.
+    csv.writer(buffer).writerows(
+        (user_id, content, status, due_date and due_date.isoformat(),
+         priority, now, now)
+        for content, status, due_date, priority in records
+    )
+    sql = (f'COPY {Todo._meta.db_table} ({", ".join(IMPORT_COLUMNS)}) '
+           'FROM STDIN WITH (FORMAT csv)')
+
+    with connection.cursor() as cursor:
+        if is_psycopg3:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+
+
+def bulk_create_todos(user_id, records):
+    """Insert todo records for a user with multi-row INSERTs."""
+    Todo.objects.bulk_create(
+        Todo(user_id=user_id, content=content, status=status,
+             due_date=due_date, priority=priority)
+        for content, status, due_date, priority in records
+    )
+
+
+def get_loader(method):
+    """Return the function loading records with a method.
+
+    COPY is only available on Postgres; other databases fall back to
+    bulk_create.
+    """
+    if method == COPY and connection.vendor == 'postgresql':
+        return copy_todos
+    return bulk_create_todos
+
+
+def import_todos(user, rows, batch_size=None, method=None, progress=None):
+    """Import (line number, row) pairs as todos of a user.
+
+    Calls progress, if given, with the running result after each batch.
+    Returns the number of imported and failed rows and the errors of the
+    first TODO_IMPORT_MAX_ERRORS failed rows.
+    """
+    batch_size = batch_size or settings.TODO_IMPORT_BATCH_SIZE
+    load = get_loader(method or settings.TODO_IMPORT_METHOD)
+    result = {'imported': 0, 'failed': 0, 'errors': []}
+
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        records, errors = clean_batch(batch)
+        if records:
+            with transaction.atomic():
+                load(user.pk, records)
+                invalidate_todo_list(user.pk)
+
+        result['imported'] += len(records)
+        result['failed'] += len(errors)
+        room = settings.TODO_IMPORT_MAX_ERRORS - len(result['errors'])
+        result['errors'] += errors[:max(room, 0)]
+        if progress is not None:
+            progress(result)
+
+    return result
@@ -0,0 +1,249 @@
+"""
+Pagination for todo APIs.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from todo.filters import TodoPageFilterBackend
+
+
+class TodoCursorPagination(BasePagination):
+    """Keyset pagination over the ordering of the todo list.
+
+    Each cursor carries the ordering key of the row it starts after, so a
+    page is served by an index range scan no matter how deep it is and
+    rows inserted concurrently never shift the pages that follow. The
+    ordering comes from a filter backend with get_ordering(), like DRF's
+    cursor pagination, and must end with a unique field.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = 50
+    max_page_size = 500
+    ordering = ('created_at', 'id')
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of the queryset after the requested cursor."""
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page(list(queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the unevaluated queryset of the requested page.
+
+        It fetches one row past the page to tell whether another page
+        follows; pass the fetched rows to set_page(). Splitting the two
+        lets async views evaluate the queryset with async iteration.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor['reverse']
+        ordering = self.reverse_ordering() if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(ordering, self.cursor['key']))
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Return the page from the rows fetched by get_page_queryset()."""
+        reverse = self.cursor is not None and self.cursor['reverse']
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        """Wrap a page of serialized todos with its cursor links."""
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {
+                    'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def get_page_size(self, request):
+        """Return the requested page size, clamped to max_page_size."""
+        try:
+            limit = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if limit <= 0:
+            return self.page_size
+        return min(limit, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering requested through the view's filters."""
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                return tuple(
+                    backend().get_ordering(request, queryset, view))
+
+        return self.ordering
+
+    def reverse_ordering(self):
+        """Return the ordering flipped, for walking backwards."""
+        return tuple(
+            name[1:] if name.startswith('-') else '-' + name
+            for name in self.ordering
+        )
+
+    def get_keyset_filter(self, ordering, key):
+        """Return a filter selecting rows strictly after key in ordering.
+
+        NULLs sort last in ascending and first in descending order, as
+        they do in Postgres indexes.
+        """
+        condition = None
+        for name, field, value in reversed(
+                list(zip(ordering, self.fields, key))):
+            column = field.name
+            descending = name.startswith('-')
+            if value is None:
+                same = Q(**{f'{column}__isnull': True})
+                after = (Q(**{f'{column}__isnull': False})
+                         if descending else None)
+            else:
+                same = Q(**{column: value})
+                after = Q(**{f'{column}__{"lt" if descending else "gt"}':
+                             value})
+                if field.null and not descending:
+                    after |= Q(**{f'{column}__isnull': True})
+
+            if condition is None:
+                condition = after if after is not None else Q(pk__in=[])
+            elif after is None:
+                condition = same & condition
+            else:
+                condition = after | (same & condition)
+
+        # Repeat the leading bound on its own so the planner can seek the
+        # index instead of evaluating the OR across the whole user range.
+        field, value = self.fields[0], key[0]
+        if not field.null:
+            lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+            condition = Q(**{f'{field.name}__{lookup}': value}) & condition
+
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_key(self, instance):
+        """Return the ordering key of an instance or .values() row."""
+        key = []
+        for field in self.fields:
+            if isinstance(instance, dict):
+                value = instance[field.attname]
+            else:
+                value = getattr(instance, field.attname)
+            key.append(value.isoformat() if hasattr(value, 'isoformat')
+                       else value)
+        return key
+
+    def encode_cursor(self, instance, reverse):
+        """Return a link to the page adjacent to instance."""
+        payload = {'o': list(self.ordering), 'k': self.get_key(instance)}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('ascii')
+        ).decode('ascii')
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """Return the cursor from the request, or None for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(
+                encoded.encode('ascii')).decode('ascii'))
+            if tuple(payload['o']) != self.ordering:
+                raise ValueError
+            if len(payload['k']) != len(self.fields):
+                raise ValueError
+            key = [
+                None if value is None else field.to_python(value)
+                for field, value in zip(self.fields, payload['k'])
+            ]
+            if key[-1] is None:
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {'key': key, 'reverse': bool(payload.get('r'))}
+
+
+class TodoPagePagination(TodoCursorPagination):
+    """Cursor pagination of the htmx todo pages."""
+    page_size = settings.TODO_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering of the page, newest first by default."""
+        return tuple(
+            TodoPageFilterBackend().get_ordering(request, queryset, view))
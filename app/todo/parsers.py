@@ -0,0 +1,22 @@
+"""
+Parsers for todo APIs.
+"""
+from rest_framework.parsers import BaseParser
+
+from todo.imports import read_csv, read_ndjson
+
+
+class NDJSONParser(BaseParser):
+    """Parse newline-delimited JSON lazily into (line, value) pairs."""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return read_ndjson(stream if stream is not None else [])
+
+
+class CSVParser(BaseParser):
+    """Parse CSV with a header row lazily into (line, row) pairs."""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return read_csv(stream if stream is not None else [])
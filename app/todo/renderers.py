@@ -0,0 +1,36 @@
+"""
+Renderers for todo APIs.
+"""
+import csv
+import io
+
+from rest_framework.renderers import BaseRenderer
+
+from core.renderers import dumps
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render newline-delimited JSON, one object per line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(dumps(row) + b'\n' for row in rows)
+
+
+class CSVRenderer(BaseRenderer):
+    """Render a list of flat objects as CSV with a header row."""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        buffer = io.StringIO()
+        if rows:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return buffer.getvalue().encode(self.charset)
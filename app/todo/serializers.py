@@ -1,11 +1,37 @@
 """
 Serializers for todo APIs
 """
-from rest_framework import serializers
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
 from core.models import Todo
 
 
+class TodoListSerializer(serializers.ListSerializer):
+    """Serializer for writing many todos with bulk queries."""
+
+    def create(self, validated_data):
+        """Create and return todos with a single insert."""
+        return Todo.objects.bulk_create(
+            Todo(**attrs) for attrs in validated_data)
+
+    def update(self, instance, validated_data):
+        """Update and return todos with a single update."""
+        now = timezone.now()
+        fields = {'updated_at'}
+        for todo, attrs in zip(instance, validated_data):
+            for attr, value in attrs.items():
+                setattr(todo, attr, value)
+            todo.updated_at = now
+            fields.update(attrs)
+
+        Todo.objects.bulk_update(instance, fields)
+
+        return instance
+
+
 class TodoSerializer(serializers.ModelSerializer):
     """Serializer for todos."""
 
@@ -14,6 +40,47 @@ class TodoSerializer(serializers.ModelSerializer):
         fields = ['id', 'content', 'status',
                   'due_date', 'priority', 'created_at']
         read_only_fields = ['id']
+        list_serializer_class = TodoListSerializer
+
+
+def get_datetime_formatter():
+    """Return a function formatting datetimes as DateTimeField does."""
+    field = serializers.DateTimeField()
+    output_format = api_settings.DATETIME_FORMAT
+    if not settings.USE_TZ or output_format is None or \
+            output_format.lower() != ISO_8601:
+        return lambda value: \
+            None if value is None else field.to_representation(value)
+
+    tz = field.default_timezone()
+
+    def format_datetime(value):
+        if value is None:
+            return None
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            return value[:-6] + 'Z'
+        return value
+
+    return format_datetime
+
+
+def serialize_todo_rows(rows):
+    """Return todo rows from .values() as TodoSerializer would.
+
+    The rows must hold the fields of TodoSerializer in order. Skipping
+    DRF's per-field machinery makes this several times faster for long
+    lists; the output is the same.
+    """
+    format_datetime = get_datetime_formatter()
+    todos = []
+    for row in rows:
+        todo = dict(row)
+        todo['due_date'] = format_datetime(todo['due_date'])
+        todo['created_at'] = format_datetime(todo['created_at'])
+        todos.append(todo)
+
+    return todos
 
 
 class TodoDetailSerializer(TodoSerializer):
@@ -21,3 +88,54 @@ class TodoDetailSerializer(TodoSerializer):
 
     class Meta(TodoSerializer.Meta):
         fields = TodoSerializer.Meta.fields + ['content']
+
+
+class TodoStatsSerializer(serializers.Serializer):
+    """Serializer for todo counters."""
+    total = serializers.IntegerField(read_only=True)
+    active = serializers.IntegerField(read_only=True)
+    completed = serializers.IntegerField(read_only=True)
+    overdue = serializers.IntegerField(read_only=True)
+    priority = serializers.IntegerField(read_only=True)
+
+
+class TodoSyncSerializer(serializers.Serializer):
+    """Serializer for todo changes since a sync token."""
+    changed = TodoSerializer(many=True, read_only=True)
+    deleted = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True)
+    full = serializers.BooleanField(read_only=True)
+    watermark = serializers.CharField(read_only=True)
+
+
+class TodoImportErrorSerializer(serializers.Serializer):
+    """Serializer for the errors of a row that failed to import."""
+    line = serializers.IntegerField(read_only=True)
+    errors = serializers.DictField(
+        child=serializers.ListField(child=serializers.CharField()),
+        read_only=True,
+    )
+
+
+class TodoImportSerializer(serializers.Serializer):
+    """Serializer for the result of a todo import."""
+    imported = serializers.IntegerField(read_only=True)
+    failed = serializers.IntegerField(read_only=True)
+    errors = TodoImportErrorSerializer(many=True, read_only=True)
+
+
+class TodoBulkDeleteSerializer(serializers.Serializer):
+    """Serializer for deleting many todos."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+    )
+
+    def validate_ids(self, value):
+        """Validate the batch is within the configured size."""
+        if len(value) > settings.TODO_BULK_MAX_BATCH_SIZE:
+            raise serializers.ValidationError(
+                'Ensure this field has no more than '
+                f'{settings.TODO_BULK_MAX_BATCH_SIZE} elements.')
+
+        return value
@@ -0,0 +1,27 @@
+"""
+Signal handlers for the todo app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Todo, TodoTombstone
+from todo.cache import invalidate_todo_list
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+def invalidate_todo_cache(sender, instance, **kwargs):
+    """Invalidate the cached todo lists of the todo owner."""
+    invalidate_todo_list(instance.user_id)
+
+
+@receiver(post_delete, sender=Todo)
+def record_todo_tombstone(sender, instance, origin=None, **kwargs):
+    """Record a deleted todo so delta sync can report it.
+
+    Todos removed along with their user are skipped, as the user's
+    tombstones are deleted in the same cascade.
+    """
+    if isinstance(origin, Todo) or getattr(origin, 'model', None) is Todo:
+        TodoTombstone.objects.create(
+            user_id=instance.user_id, todo_id=instance.pk)
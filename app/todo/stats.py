@@ -0,0 +1,30 @@
+"""
+Aggregate counters for a user's todos.
+"""
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models import Todo
+
+
+def _stats_aggregates():
+    """Return the conditional aggregates of the todo counters."""
+    return {
+        'total': Count('id'),
+        'active': Count('id', filter=Q(status=False)),
+        'completed': Count('id', filter=Q(status=True)),
+        'overdue': Count('id', filter=Q(
+            status=False, due_date__lt=timezone.now())),
+        'priority': Count('id', filter=Q(priority=True)),
+    }
+
+
+def get_todo_stats(user):
+    """Return todo counters for a user computed in a single query."""
+    return Todo.objects.filter(user=user).aggregate(**_stats_aggregates())
+
+
+async def aget_todo_stats(user):
+    """Return todo counters for a user, for async views."""
+    return await Todo.objects.filter(user=user).aaggregate(
+        **_stats_aggregates())
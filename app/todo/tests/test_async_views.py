@@ -0,0 +1,111 @@
+"""
+Tests for the async todo views.
+"""
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+
+from core.models import Todo
+
+
+LIST_URL = reverse('todo_async:todos')
+CREATE_URL = reverse('todo_async:create_todo')
+STATS_URL = reverse('todo_async:todo_stats')
+API_LIST_URL = reverse('todo_async:todo-list')
+
+
+def api_detail_url(todo_id):
+    """Create and return an async todo API detail URL."""
+    return reverse('todo_async:todo-detail', args=[todo_id])
+
+
+class AsyncTodoViewTests(TestCase):
+    """Test the async views against the async test client."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123')
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='testpass123')
+        self.todo = Todo.objects.create(
+            user=self.user, content='mine', status=False)
+        self.other_todo = Todo.objects.create(user=other, content='theirs')
+        self.async_client.force_login(self.user)
+
+    async def test_login_required(self):
+        """Test anonymous requests are redirected or rejected."""
+        client = AsyncClient()
+
+        res = await client.get(LIST_URL)
+        self.assertEqual(res.status_code, 302)
+        res = await client.get(API_LIST_URL)
+        self.assertEqual(res.status_code, 403)
+
+    async def test_list_todos(self):
+        """Test the page lists only the user's todos and stats."""
+        res = await self.async_client.get(LIST_URL)
+
+        self.assertContains(res, 'mine')
+        self.assertNotContains(res, 'theirs')
+        self.assertEqual(res.context['stats']['active'], 1)
+
+    async def test_list_todos_partial(self):
+        """Test htmx requests get the filtered list partial."""
+        res = await self.async_client.get(
+            LIST_URL, {'status': 'true'}, HTTP_HX_REQUEST='true')
+
+        self.assertTemplateUsed(res, 'todo/partials/todo_list.html')
+        self.assertNotContains(res, 'mine')
+
+    async def test_create_update_delete(self):
+        """Test todos are created, toggled and deleted asynchronously."""
+        res = await self.async_client.post(CREATE_URL, {'content': 'new'})
+        self.assertEqual(res['HX-Trigger'], 'todosChanged')
+        todo = await Todo.objects.aget(user=self.user, content='new')
+
+        url = reverse('todo_async:update_todo', args=[todo.pk])
+        res = await self.async_client.put(url)
+        await todo.arefresh_from_db()
+        self.assertTrue(todo.status)
+
+        url = reverse('todo_async:delete_todo', args=[todo.pk])
+        res = await self.async_client.delete(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(await Todo.objects.filter(pk=todo.pk).aexists())
+
+    async def test_other_users_todo_not_found(self):
+        """Test another user's todo cannot be changed."""
+        url = reverse('todo_async:update_todo', args=[self.other_todo.pk])
+        res = await self.async_client.put(url)
+
+        self.assertEqual(res.status_code, 404)
+        res = await self.async_client.get(api_detail_url(self.other_todo.pk))
+        self.assertEqual(res.status_code, 404)
+
+    async def test_stats(self):
+        """Test the stats partial renders the active count."""
+        res = await self.async_client.get(STATS_URL)
+
+        self.assertContains(res, 'Active 1')
+
+    async def test_api_list_matches_sync_api(self):
+        """Test the async API list matches the viewset's response."""
+        res = await self.async_client.get(API_LIST_URL)
+        sync_res = await self.async_client.get(reverse('todo:todo-list'))
+
+        self.assertEqual(res.json()['results'],
+                         sync_res.json()['results'])
+        self.assertEqual(len(res.json()['results']), 1)
+
+    async def test_api_invalid_cursor(self):
+        """Test an invalid cursor is a 404 like the viewset."""
+        res = await self.async_client.get(API_LIST_URL, {'cursor': 'bad'})
+
+        self.assertEqual(res.status_code, 404)
+
+    async def test_api_detail(self):
+        """Test retrieving a todo."""
+        res = await self.async_client.get(api_detail_url(self.todo.pk))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['content'], 'mine')
@@ -0,0 +1,171 @@
+"""
+Tests for the todo import.
+"""
+import csv
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Todo
+from todo.imports import (
+    BULK_CREATE,
+    COPY,
+    InvalidLine,
+    clean_batch,
+    import_todos,
+    read_csv,
+    read_ndjson,
+)
+
+
+class ReadTests(TestCase):
+    """Test reading import files."""
+
+    def test_read_ndjson(self):
+        """Test NDJSON lines are parsed with their line numbers."""
+        lines = [b'\xef\xbb\xbf{"content": "a"}\n', b'\n', b'{oops\n',
+                 b'{"content": "b"}']
+
+        self.assertEqual(list(read_ndjson(lines)), [
+            (1, {'content': 'a'}),
+            (3, InvalidLine('Invalid JSON.')),
+            (4, {'content': 'b'}),
+        ])
+
+    def test_read_ndjson_invalid_utf8(self):
+        """Test undecodable lines are reported and reading goes on."""
+        lines = [b'{"content": "a"}\n', b'{"content": "\xff"}\n',
+                 b'{"content": "b"}\n']
+
+        self.assertEqual(list(read_ndjson(lines)), [
+            (1, {'content': 'a'}),
+            (2, InvalidLine('Invalid UTF-8.')),
+            (3, {'content': 'b'}),
+        ])
+
+    def test_read_csv(self):
+        """Test CSV records are read as dicts, quoted newlines included."""
+        lines = [b'content,status\n', b'"two\n', b'lines",true\n',
+                 b'single,false\n']
+
+        self.assertEqual(list(read_csv(lines)), [
+            (3, {'content': 'two\nlines', 'status': 'true'}),
+            (4, {'content': 'single', 'status': 'false'}),
+        ])
+
+    def test_read_csv_invalid_lines(self):
+        """Test undecodable and malformed records are reported."""
+        too_long = 'x' * (csv.field_size_limit() + 1)
+        lines = [b'content\n', b'\xff\n', f'{too_long}\n'.encode(),
+                 b'ok\n']
+
+        rows = list(read_csv(lines))
+
+        self.assertEqual(rows[0], (2, InvalidLine('Invalid UTF-8.')))
+        self.assertEqual(rows[1][0], 3)
+        self.assertTrue(rows[1][1].error.startswith('Invalid CSV: '))
+        self.assertEqual(rows[2], (4, {'content': 'ok'}))
+
+
+class CleanBatchTests(TestCase):
+    """Test validating import rows."""
+
+    def test_valid_rows(self):
+        """Test rows are converted with the API's defaults."""
+        records, errors = clean_batch([
+            (1, {'content': ' a '}),
+            (2, {'content': 'b', 'status': 'false', 'priority': True,
+                 'due_date': '2030-01-02T03:04:05Z'}),
+            (3, {'content': 'c', 'due_date': '2030-01-02 03:04'}),
+        ])
+
+        due_date = datetime.datetime(2030, 1, 2, 3, 4, 5,
+                                     tzinfo=datetime.timezone.utc)
+        self.assertEqual(errors, [])
+        self.assertEqual(records[:2], [
+            ('a', True, None, False),
+            ('b', False, due_date, True),
+        ])
+        self.assertTrue(timezone.is_aware(records[2][2]))
+
+    def test_invalid_rows(self):
+        """Test invalid rows are reported by line and field."""
+        records, errors = clean_batch([
+            (1, None),
+            (2, {'content': ''}),
+            (3, {'content': 'x' * 256, 'status': 'maybe',
+                 'due_date': 'tomorrow', 'priority': []}),
+        ])
+
+        self.assertEqual(records, [])
+        self.assertEqual(errors[0], {'line': 1, 'errors': {
+            'non_field_errors': ['Expected an object.']}})
+        self.assertEqual(list(errors[1]['errors']), ['content'])
+        self.assertEqual(errors[2]['line'], 3)
+        self.assertEqual(set(errors[2]['errors']),
+                         {'content', 'status', 'due_date', 'priority'})
+
+    def test_unstorable_content(self):
+        """Test NUL and lone surrogate characters are refused."""
+        records, errors = clean_batch([
+            (1, {'content': 'a\x00b'}),
+            (2, {'content': 'a\ud800b'}),
+            (3, InvalidLine('Invalid JSON.')),
+        ])
+
+        self.assertEqual(records, [])
+        self.assertEqual(errors, [
+            {'line': 1, 'errors': {
+                'content': ['Null characters are not allowed.']}},
+            {'line': 2, 'errors': {
+                'content': ['Surrogate characters are not allowed: U+D800.']}},
+            {'line': 3, 'errors': {'non_field_errors': ['Invalid JSON.']}},
+        ])
+
+
+class ImportTodosTests(TestCase):
+    """Test loading todos."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@example.com', 'testpass123')
+        self.rows = [
+            (1, {'content': 'first', 'due_date': '2030-01-02T03:04:05Z'}),
+            (2, {'content': 'second, "quoted"', 'status': False}),
+            (3, {'content': ''}),
+            (4, {'content': 'third', 'priority': True}),
+        ]
+
+    def test_import_methods(self):
+        """Test COPY and bulk_create load the same todos."""
+        for method in [COPY, BULK_CREATE]:
+            Todo.objects.all().delete()
+            progress = []
+
+            result = import_todos(self.user, self.rows, batch_size=2,
+                                  method=method, progress=progress.append)
+
+            self.assertEqual(result['imported'], 3)
+            self.assertEqual(result['failed'], 1)
+            self.assertEqual(result['errors'][0]['line'], 3)
+            self.assertEqual(len(progress), 2)
+            todos = list(Todo.objects.filter(user=self.user).order_by('id'))
+            self.assertEqual(
+                [(t.content, t.status, t.priority) for t in todos],
+                [('first', True, False), ('second, "quoted"', False, False),
+                 ('third', True, True)])
+            self.assertEqual(todos[0].due_date.year, 2030)
+            self.assertIsNone(todos[1].due_date)
+            self.assertIsNotNone(todos[2].created_at)
+
+    @override_settings(TODO_IMPORT_MAX_ERRORS=2)
+    def test_errors_capped(self):
+        """Test only the first TODO_IMPORT_MAX_ERRORS errors are kept."""
+        rows = [(n, {'content': ''}) for n in range(5)]
+
+        result = import_todos(self.user, rows, batch_size=2)
+
+        self.assertEqual(result['failed'], 5)
+        self.assertEqual([e['line'] for e in result['errors']], [0, 1])
@@ -1,21 +1,45 @@
 """
 Tests for todo APIs.
 """
+import csv
 import datetime
+import io
+import json
+import warnings
+from unittest.mock import patch
+
+import msgpack
+from asgiref.sync import sync_to_async
+
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
 
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
-from core.models import Todo
+from core.models import Todo, TodoTombstone
+from core.renderers import FastJSONRenderer
 
 from todo.serializers import (
-    TodoDetailSerializer)
+    TodoSerializer,
+    TodoDetailSerializer,
+    serialize_todo_rows)
+from todo.sync import decode_watermark
 
 TODOS_URL = reverse('todo:todo-list')
+STATS_URL = reverse('todo:todo-stats')
+BULK_URL = reverse('todo:todo-bulk')
+SYNC_URL = reverse('todo:todo-sync')
+EXPORT_URL = reverse('todo:todo-export')
+IMPORT_URL = reverse('todo:todo-import-todos')
 
 
 def detail_url(todo_id):
@@ -60,10 +84,219 @@ class PrivateTodoApiTests(TestCase):
     """Test authenticated API requests."""
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = create_user(email='user@example.com', password='test123')
         self.client.force_authenticate(self.user)
 
+    def test_retrieve_todos(self):
+        """Test retrieving a list of todos."""
+        create_todo(user=self.user)
+        create_todo(user=self.user)
+
+        res = self.client.get(TODOS_URL)
+
+        todos = Todo.objects.filter(user=self.user).order_by('created_at')
+        serializer = TodoSerializer(todos, many=True)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], serializer.data)
+        self.assertIsNone(res.data['next'])
+        self.assertIsNone(res.data['previous'])
+
+    def test_todo_list_limited_to_user(self):
+        """Test list of todos is limited to authenticated user."""
+        other_user = create_user(email='other@example.com', password='test123')
+        create_todo(user=other_user)
+        todo = create_todo(user=self.user)
+
+        res = self.client.get(TODOS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['id'] for t in res.data['results']], [todo.id])
+
+    def test_todo_list_cursor_pagination(self):
+        """Test walking the todo list forwards and backwards by cursor."""
+        todos = [create_todo(user=self.user, content=f'todo {i}')
+                 for i in range(5)]
+        ids = [t.id for t in todos]
+
+        res = self.client.get(TODOS_URL, {'limit': 2})
+        self.assertEqual([t['id'] for t in res.data['results']], ids[:2])
+        self.assertIsNone(res.data['previous'])
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual([t['id'] for t in res.data['results']], ids[2:4])
+
+        next_url = res.data['next']
+        res = self.client.get(res.data['previous'])
+        self.assertEqual([t['id'] for t in res.data['results']], ids[:2])
+
+        res = self.client.get(next_url)
+        self.assertEqual([t['id'] for t in res.data['results']], ids[4:])
+        self.assertIsNone(res.data['next'])
+
+    def test_todo_list_cursor_stable_with_inserts(self):
+        """Test rows created between pages do not shift the next page."""
+        todos = [create_todo(user=self.user) for _ in range(3)]
+
+        res = self.client.get(TODOS_URL, {'limit': 2})
+        earlier = create_todo(user=self.user)
+        Todo.objects.filter(id=earlier.id).update(
+            created_at=timezone.now() - datetime.timedelta(days=5))
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual([t['id'] for t in res.data['results']],
+                         [todos[2].id])
+
+    def test_todo_list_invalid_cursor(self):
+        """Test a malformed cursor returns an error."""
+        res = self.client.get(TODOS_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_todo_list_served_from_cache(self):
+        """Test a repeated list request only runs the ETag query."""
+        create_todo(user=self.user)
+        res = self.client.get(TODOS_URL)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(TODOS_URL)
+
+        self.assertEqual(cached.data, res.data)
+
+    def test_todo_list_cache_key_length(self):
+        """Test a long search still gives a valid cache key."""
+        create_todo(user=self.user)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            res = self.client.get(TODOS_URL, {'search': 'x' * 255})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_todo_list_cache_invalidated_on_write(self):
+        """Test the cached list reflects updates and deletes."""
+        todo = create_todo(user=self.user, status=False)
+        self.client.get(TODOS_URL)
+
+        self.client.patch(detail_url(todo.id), {'status': True})
+        res = self.client.get(TODOS_URL)
+        self.assertTrue(res.data['results'][0]['status'])
+
+        self.client.delete(detail_url(todo.id))
+        res = self.client.get(TODOS_URL)
+        self.assertEqual(res.data['results'], [])
+
+    def test_todo_list_cache_invalidated_on_bulk_write(self):
+        """Test the cached list reflects bulk creates and updates."""
+        self.client.get(TODOS_URL)
+
+        self.client.post(BULK_URL, [{'content': 'bulk todo'}], format='json')
+        res = self.client.get(TODOS_URL)
+        self.assertEqual(len(res.data['results']), 1)
+
+        todo_id = res.data['results'][0]['id']
+        self.client.patch(
+            BULK_URL, [{'id': todo_id, 'content': 'renamed'}], format='json')
+        res = self.client.get(TODOS_URL)
+        self.assertEqual(res.data['results'][0]['content'], 'renamed')
+
+    def test_todo_list_not_modified(self):
+        """Test an unchanged list returns 304 for a matching ETag."""
+        todo = create_todo(user=self.user)
+        res = self.client.get(TODOS_URL)
+        self.assertIn('ETag', res)
+        self.assertIn('Last-Modified', res)
+
+        res = self.client.get(TODOS_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(detail_url(todo.id), {'status': False})
+        res = self.client.get(TODOS_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_todo_list_etag_changes_on_delete(self):
+        """Test deleting a todo changes the list ETag."""
+        todos = [create_todo(user=self.user) for _ in range(2)]
+        res = self.client.get(TODOS_URL)
+
+        self.client.delete(detail_url(todos[0].id))
+        res = self.client.get(TODOS_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_todo_list_modified_on_delete(self):
+        """Test deleting a todo moves the list Last-Modified."""
+        todos = [create_todo(user=self.user) for _ in range(2)]
+        Todo.objects.filter(user=self.user).update(
+            updated_at=timezone.now() - datetime.timedelta(hours=1))
+        res = self.client.get(TODOS_URL)
+
+        self.client.delete(detail_url(todos[0].id))
+        res = self.client.get(TODOS_URL,
+                              HTTP_IF_MODIFIED_SINCE=res['Last-Modified'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['id'] for t in res.data['results']],
+                         [todos[1].id])
+
+    def test_todo_list_etag_changes_when_overdue(self):
+        """Test a todo passing its due date changes the list ETag."""
+        todo = create_todo(user=self.user, status=False)
+        res = self.client.get(TODOS_URL, {'overdue': 'true'})
+
+        # Move the due date without touching updated_at, as time would.
+        Todo.objects.filter(id=todo.id).update(
+            due_date=timezone.now() - datetime.timedelta(minutes=1))
+        res = self.client.get(TODOS_URL, {'overdue': 'true'},
+                              HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['id'] for t in res.data['results']], [todo.id])
+
+    def test_todo_detail_not_modified(self):
+        """Test an unchanged todo returns 304 for a matching ETag."""
+        todo = create_todo(user=self.user)
+        url = detail_url(todo.id)
+        res = self.client.get(url)
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(url, {'content': 'changed'})
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_todo_detail_etag_varies_by_media_type(self):
+        """Test a todo's ETag is not shared between media types."""
+        url = detail_url(create_todo(user=self.user).id)
+        res = self.client.get(url)
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'],
+                              HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+
+    def test_todo_stats(self):
+        """Test retrieving todo counters."""
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        create_todo(user=self.user, status=True, priority=True)
+        create_todo(user=self.user, status=False)
+        create_todo(user=self.user, status=False, due_date=yesterday)
+        other_user = create_user(email='other@example.com', password='test123')
+        create_todo(user=other_user, status=False)
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'total': 3,
+            'active': 2,
+            'completed': 1,
+            'overdue': 1,
+            'priority': 1,
+        })
+
     def test_get_todo_detail(self):
         """Test get todo detail.."""
         todo = create_todo(user=self.user)
@@ -92,6 +325,92 @@ class PrivateTodoApiTests(TestCase):
         todo.refresh_from_db()
         self.assertEqual(todo.status, payload['status'])
 
+    def test_partial_update_single_query(self):
+        """Test a partial update is a single UPDATE of the user's todo."""
+        todo = create_todo(user=self.user, status=True)
+        other = create_todo(
+            user=create_user(email='other@example.com', password='test123'))
+
+        with self.assertNumQueries(1):
+            res = self.client.patch(detail_url(todo.id), {'status': False})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data['status'])
+        res = self.client.patch(detail_url(other.id), {'status': False})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        other.refresh_from_db()
+        self.assertTrue(other.status)
+
+    def test_toggle_todo(self):
+        """Test the htmx toggle flips status in a single UPDATE."""
+        self.client.force_login(self.user)
+        todo = create_todo(user=self.user, status=False)
+        url = reverse('todo:update_todo', args=[todo.id])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.put(url)
+        todo_queries = [q['sql'] for q in ctx.captured_queries
+                        if '"core_todo"' in q['sql']]
+        self.assertEqual(len(todo_queries), 1)
+        self.assertTrue(todo_queries[0].startswith('UPDATE'))
+        todo.refresh_from_db()
+        self.assertTrue(todo.status)
+
+        self.client.put(url)
+        todo.refresh_from_db()
+        self.assertFalse(todo.status)
+
+    def test_toggle_other_users_todo(self):
+        """Test the htmx toggle is scoped to the user's todos."""
+        self.client.force_login(self.user)
+        todo = create_todo(
+            user=create_user(email='other@example.com', password='test123'),
+            status=False)
+
+        res = self.client.put(reverse('todo:update_todo', args=[todo.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        todo.refresh_from_db()
+        self.assertFalse(todo.status)
+
+    def test_htmx_delete_records_tombstone(self):
+        """Test the htmx delete removes the todo and records a tombstone."""
+        self.client.force_login(self.user)
+        todo = create_todo(user=self.user)
+
+        res = self.client.delete(reverse('todo:delete_todo', args=[todo.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(Todo.objects.filter(id=todo.id).exists())
+        self.assertTrue(TodoTombstone.objects.filter(
+            user=self.user, todo_id=todo.id).exists())
+
+    @patch('todo.pagination.TodoPagePagination.page_size', 2)
+    def test_htmx_list_paginated(self):
+        """Test the htmx list pages newest first with a next link."""
+        self.client.force_login(self.user)
+        for content in ['oldest', 'middle', 'newest']:
+            create_todo(user=self.user, content=content)
+
+        res = self.client.get(reverse('todo:todos'))
+        self.assertEqual([todo['content'] for todo in res.context['todos']],
+                         ['newest', 'middle'])
+        self.assertContains(res, 'hx-trigger="revealed"')
+
+        res = self.client.get(res.context['next'], HTTP_HX_REQUEST='true')
+        self.assertTemplateUsed(res, 'todo/partials/todo_list.html')
+        self.assertEqual([todo['content'] for todo in res.context['todos']],
+                         ['oldest'])
+        self.assertIsNone(res.context['next'])
+
+    def test_htmx_list_invalid_cursor(self):
+        """Test the htmx list returns 404 for an invalid cursor."""
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('todo:todos'), {'cursor': 'bad'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_full_update(self):
         """Test full update of todo."""
         todo = create_todo(
@@ -139,3 +458,452 @@ class PrivateTodoApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
         self.assertTrue(Todo.objects.filter(id=todo.id).exists())
+
+    def test_bulk_create_todos(self):
+        """Test creating many todos in one request."""
+        payload = [{'content': f'todo {i}', 'status': False}
+                   for i in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        todos = Todo.objects.filter(user=self.user).order_by('id')
+        self.assertEqual([t.content for t in todos],
+                         [item['content'] for item in payload])
+        self.assertEqual([item['id'] for item in res.data],
+                         [t.id for t in todos])
+
+    def test_bulk_create_invalid_item(self):
+        """Test one invalid item rejects the whole batch."""
+        payload = [{'content': 'valid todo'}, {'status': False}]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('content', res.data[1])
+        self.assertFalse(Todo.objects.filter(user=self.user).exists())
+
+    @override_settings(TODO_BULK_MAX_BATCH_SIZE=2)
+    def test_bulk_create_max_batch_size(self):
+        """Test batches over the maximum size are rejected."""
+        payload = [{'content': f'todo {i}'} for i in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Todo.objects.filter(user=self.user).exists())
+
+    def test_bulk_update_todos(self):
+        """Test updating many todos in one request."""
+        todos = [create_todo(user=self.user, status=False) for _ in range(2)]
+        payload = [
+            {'id': todos[0].id, 'status': True},
+            {'id': todos[1].id, 'content': 'renamed'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for todo in todos:
+            todo.refresh_from_db()
+        self.assertTrue(todos[0].status)
+        self.assertEqual(todos[1].content, 'renamed')
+        self.assertEqual([item['id'] for item in res.data],
+                         [t.id for t in todos])
+
+    def test_bulk_update_bool_id_error(self):
+        """Test booleans are not accepted as todo ids."""
+        todo = create_todo(user=self.user, id=1, status=False)
+        payload = [{'id': True, 'status': True}]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0]['id'][0],
+                         'A valid integer is required.')
+        todo.refresh_from_db()
+        self.assertFalse(todo.status)
+
+    def test_bulk_update_other_users_todo_error(self):
+        """Test updating another users todo in a batch gives an error."""
+        other_user = create_user(email='other@example.com', password='test123')
+        todo = create_todo(user=self.user, status=False)
+        other_todo = create_todo(user=other_user, status=False)
+        payload = [
+            {'id': todo.id, 'status': True},
+            {'id': other_todo.id, 'status': True},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        todo.refresh_from_db()
+        other_todo.refresh_from_db()
+        self.assertFalse(todo.status)
+        self.assertFalse(other_todo.status)
+
+    def test_bulk_delete_todos(self):
+        """Test deleting many todos in one request."""
+        other_user = create_user(email='other@example.com', password='test123')
+        todos = [create_todo(user=self.user) for _ in range(2)]
+        other_todo = create_todo(user=other_user)
+        ids = [todos[0].id, todos[1].id, other_todo.id]
+
+        res = self.client.delete(BULK_URL, {'ids': ids}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [
+            {'id': todos[0].id, 'status': 'deleted'},
+            {'id': todos[1].id, 'status': 'deleted'},
+            {'id': other_todo.id, 'status': 'not_found'},
+        ])
+        self.assertFalse(Todo.objects.filter(user=self.user).exists())
+        self.assertTrue(Todo.objects.filter(id=other_todo.id).exists())
+
+    def test_export_ndjson(self):
+        """Test exporting todos as newline-delimited JSON."""
+        todos = [create_todo(user=self.user, content=f'todo {n}')
+                 for n in range(3)]
+        create_todo(user=create_user(email='other@example.com',
+                                     password='test123'))
+
+        with self.settings(TODO_EXPORT_CHUNK_SIZE=2):
+            res = self.client.get(EXPORT_URL, {'format': 'ndjson'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertIn('todos.ndjson', res['Content-Disposition'])
+        rows = [json.loads(line) for line in
+                b''.join(res.streaming_content).decode().splitlines()]
+        serializer = TodoSerializer(todos, many=True)
+        self.assertEqual(rows, [
+            {field: todo[field] for field in rows[0]}
+            for todo in serializer.data
+        ])
+
+    def test_export_csv_filtered(self):
+        """Test exporting filtered todos as CSV."""
+        create_todo(user=self.user, content='done', status=False)
+        todo = create_todo(user=self.user, content='with, comma')
+
+        res = self.client.get(EXPORT_URL, {'format': 'csv', 'status': True})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join(res.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], str(todo.id))
+        self.assertEqual(rows[0]['content'], 'with, comma')
+
+    async def test_export_streams_under_asgi(self):
+        """Test ASGI exports stream from an async iterator."""
+        todos = await sync_to_async(
+            lambda: [create_todo(user=self.user, content=f'todo {n}')
+                     for n in range(3)])()
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+        with self.settings(TODO_EXPORT_CHUNK_SIZE=2):
+            res = await self.async_client.get(EXPORT_URL,
+                                              {'format': 'ndjson'})
+            self.assertTrue(res.is_async)
+            content = b''.join([chunk async for chunk in
+                                res.streaming_content])
+
+        ids = [json.loads(line)['id'] for line in content.splitlines()]
+        self.assertEqual(sorted(ids), sorted(todo.id for todo in todos))
+
+    def test_export_unknown_format(self):
+        """Test exporting in an unsupported format is refused."""
+        res = self.client.get(EXPORT_URL, {'format': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_import_ndjson(self):
+        """Test importing todos from an NDJSON body."""
+        body = '{"content": "a", "priority": true}\n{"content": ""}\n'
+
+        res = self.client.post(IMPORT_URL, body,
+                               content_type='application/x-ndjson')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['imported'], 1)
+        self.assertEqual(res.data['failed'], 1)
+        self.assertEqual(res.data['errors'][0]['line'], 2)
+        todo = Todo.objects.get(user=self.user)
+        self.assertEqual((todo.content, todo.priority), ('a', True))
+
+    def test_import_reports_unreadable_lines(self):
+        """Test unreadable lines fail on their own, not the import."""
+        body = (b'{"content": "ok"}\n{"content": "\xff"}\n'
+                b'{"content": "a\\u0000b"}\n')
+
+        res = self.client.post(IMPORT_URL, body,
+                               content_type='application/x-ndjson')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['imported'], 1)
+        self.assertEqual([e['line'] for e in res.data['errors']], [2, 3])
+
+    def test_import_csv_invalidates_list(self):
+        """Test imported todos show up in a cached list."""
+        self.client.get(TODOS_URL)
+
+        res = self.client.post(IMPORT_URL, 'content\nimported\n',
+                               content_type='text/csv')
+        list_res = self.client.get(TODOS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([t['content'] for t in list_res.data['results']],
+                         ['imported'])
+
+    def test_import_all_invalid(self):
+        """Test an import with no valid rows fails."""
+        res = self.client.post(IMPORT_URL, 'oops\n',
+                               content_type='application/x-ndjson')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Todo.objects.exists())
+
+    def test_import_unsupported_media_type(self):
+        """Test importing JSON is refused."""
+        res = self.client.post(IMPORT_URL, [], format='json')
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_list_msgpack_columnar(self):
+        """Test listing todos as columnar MessagePack."""
+        create_todo(user=self.user, content='first')
+        create_todo(user=self.user, content='second')
+        json_res = self.client.get(TODOS_URL)
+
+        res = self.client.get(
+            TODOS_URL, HTTP_ACCEPT='application/msgpack; layout=columnar')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('Accept', res['Vary'])
+        data = msgpack.unpackb(res.content)
+        self.assertEqual(data['results']['fields'], TodoSerializer.Meta.fields)
+        self.assertEqual(
+            [dict(zip(data['results']['fields'], row))
+             for row in data['results']['rows']],
+            json_res.json()['results'])
+
+    def test_bulk_create_columnar_json(self):
+        """Test creating todos from a columnar JSON body."""
+        payload = {'fields': ['content', 'priority'],
+                   'rows': [['a', True], ['b', False]]}
+
+        res = self.client.post(
+            BULK_URL, json.dumps(payload),
+            content_type='application/json; layout=columnar')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(Todo.objects.filter(user=self.user).order_by('id')
+                 .values_list('content', 'priority')),
+            [('a', True), ('b', False)])
+
+    def test_sync_without_token_returns_all(self):
+        """Test a first sync returns every todo of the user."""
+        todos = [create_todo(user=self.user) for _ in range(2)]
+        other_user = create_user(email='other@example.com', password='test123')
+        create_todo(user=other_user)
+
+        res = self.client.get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['full'])
+        self.assertEqual([t['id'] for t in res.data['changed']],
+                         [t.id for t in todos])
+        self.assertEqual(res.data['deleted'], [])
+        self.assertTrue(res.data['watermark'])
+
+    def test_sync_returns_changes_since_token(self):
+        """Test syncing from a token returns changes and deletions."""
+        kept = create_todo(user=self.user)
+        removed = create_todo(user=self.user)
+        stale = create_todo(user=self.user)
+        Todo.objects.filter(id=stale.id).update(
+            updated_at=timezone.now() - datetime.timedelta(hours=1))
+        Todo.objects.filter(id=kept.id).update(
+            updated_at=timezone.now() - datetime.timedelta(hours=1))
+        with patch('todo.sync.timezone.now', return_value=(
+                timezone.now() - datetime.timedelta(minutes=30))):
+            token = self.client.get(SYNC_URL).data['watermark']
+
+        self.client.patch(detail_url(kept.id), {'content': 'changed'})
+        self.client.delete(detail_url(removed.id))
+        res = self.client.get(SYNC_URL, {'since': token})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data['full'])
+        self.assertEqual([t['id'] for t in res.data['changed']], [kept.id])
+        self.assertEqual(res.data['changed'][0]['content'], 'changed')
+        self.assertEqual(res.data['deleted'], [removed.id])
+
+    def test_sync_invalid_token(self):
+        """Test syncing from a tampered token returns an error."""
+        res = self.client.get(SYNC_URL, {'since': 'not-a-token'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete_records_tombstones(self):
+        """Test bulk deleted todos are reported by sync."""
+        todos = [create_todo(user=self.user) for _ in range(2)]
+        token = self.client.get(SYNC_URL).data['watermark']
+
+        self.client.delete(
+            BULK_URL, {'ids': [t.id for t in todos]}, format='json')
+        res = self.client.get(SYNC_URL, {'since': token})
+
+        self.assertEqual(sorted(res.data['deleted']),
+                         sorted(t.id for t in todos))
+
+    def test_bulk_delete_single_query(self):
+        """Test bulk deletes and their tombstones take one query."""
+        todos = [create_todo(user=self.user) for _ in range(3)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.delete(
+                BULK_URL, {'ids': [t.id for t in todos]}, format='json')
+
+        todo_queries = [q['sql'] for q in ctx.captured_queries
+                        if '"core_todo' in q['sql']]
+        self.assertEqual(len(todo_queries), 1)
+        self.assertEqual(TodoTombstone.objects.filter(
+            user=self.user).count(), 3)
+
+    def test_sync_watermark_held_by_open_transaction(self):
+        """Test the watermark does not pass a transaction still writing."""
+        other = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            with other.cursor() as cursor:
+                cursor.execute('BEGIN')
+                cursor.execute('SELECT txid_current(), now()')
+                started = cursor.fetchone()[1]
+
+                res = self.client.get(SYNC_URL)
+        finally:
+            other.close()
+
+        self.assertLessEqual(decode_watermark(res.data['watermark']), started)
+
+    def test_filter_todos_by_status_and_priority(self):
+        """Test filtering todos by status and priority."""
+        match = create_todo(user=self.user, status=False, priority=True)
+        create_todo(user=self.user, status=True, priority=True)
+        create_todo(user=self.user, status=False, priority=False)
+
+        res = self.client.get(TODOS_URL, {'status': 'false',
+                                          'priority': 'true'})
+
+        self.assertEqual([t['id'] for t in res.data['results']], [match.id])
+
+    def test_filter_todos_by_due_date(self):
+        """Test filtering todos by due date range and overdue."""
+        now = timezone.now()
+        overdue = create_todo(user=self.user, status=False,
+                              due_date=now - datetime.timedelta(days=1))
+        create_todo(user=self.user, status=True,
+                    due_date=now - datetime.timedelta(days=1))
+        later = create_todo(user=self.user,
+                            due_date=now + datetime.timedelta(days=5))
+
+        res = self.client.get(TODOS_URL, {'overdue': 'true'})
+        self.assertEqual([t['id'] for t in res.data['results']],
+                         [overdue.id])
+
+        res = self.client.get(TODOS_URL, {
+            'due_after': (now + datetime.timedelta(days=2)).isoformat()})
+        self.assertEqual([t['id'] for t in res.data['results']], [later.id])
+
+    def test_filter_todos_invalid_param(self):
+        """Test an invalid filter value returns an error."""
+        res = self.client.get(TODOS_URL, {'ordering': 'content'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_todos(self):
+        """Test full-text search on todo content."""
+        match = create_todo(user=self.user, content='Buy fresh apples')
+        create_todo(user=self.user, content='Call the plumber')
+
+        res = self.client.get(TODOS_URL, {'search': 'apple'})
+
+        self.assertEqual([t['id'] for t in res.data['results']], [match.id])
+
+    def test_order_todos_by_due_date_paginated(self):
+        """Test paging through todos ordered by a nullable due date."""
+        now = timezone.now()
+        todos = [
+            create_todo(user=self.user,
+                        due_date=now + datetime.timedelta(days=3)),
+            create_todo(user=self.user, due_date=None),
+            create_todo(user=self.user,
+                        due_date=now + datetime.timedelta(days=1)),
+            create_todo(user=self.user, due_date=None),
+            create_todo(user=self.user,
+                        due_date=now + datetime.timedelta(days=2)),
+        ]
+        expected = [todos[2].id, todos[4].id, todos[0].id,
+                    todos[1].id, todos[3].id]
+
+        for ordering, ids in [('due_date', expected),
+                              ('-due_date', expected[::-1])]:
+            seen = []
+            res = self.client.get(TODOS_URL, {'ordering': ordering,
+                                              'limit': 2})
+            seen += [t['id'] for t in res.data['results']]
+            while res.data['next']:
+                res = self.client.get(res.data['next'])
+                seen += [t['id'] for t in res.data['results']]
+            self.assertEqual(seen, ids)
+
+            res = self.client.get(res.data['previous'])
+            self.assertEqual([t['id'] for t in res.data['results']],
+                             ids[2:4])
+
+
+class FastSerializationTests(TestCase):
+    """Test the fast list serialization matches TodoSerializer."""
+
+    def setUp(self):
+        self.user = create_user(email='user@example.com', password='test123')
+
+    def test_serialize_todo_rows(self):
+        """Test .values() rows serialize like TodoSerializer."""
+        create_todo(user=self.user, content='naïve   "quoted"\n')
+        create_todo(user=self.user, due_date=None, status=False)
+        create_todo(user=self.user, due_date=timezone.now().replace(
+            microsecond=0), priority=True)
+        todos = Todo.objects.order_by('id')
+        rows = todos.values(*TodoSerializer.Meta.fields)
+
+        expected = TodoSerializer(todos, many=True).data
+        self.assertEqual(serialize_todo_rows(rows), expected)
+        self.assertEqual(
+            FastJSONRenderer().render(serialize_todo_rows(rows)),
+            JSONRenderer().render(expected))
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_serialize_todo_rows_time_zone(self):
+        """Test datetimes are shown in the current time zone."""
+        create_todo(user=self.user)
+        todos = Todo.objects.all()
+
+        self.assertEqual(
+            serialize_todo_rows(todos.values(*TodoSerializer.Meta.fields)),
+            TodoSerializer(todos, many=True).data)
+
+    def test_fast_renderer_fallback(self):
+        """Test values orjson cannot encode are rendered by json."""
+        data = {'detail': _('Not found.'), 'big': 2 ** 70}
+
+        self.assertEqual(FastJSONRenderer().render(data),
+                         JSONRenderer().render(data))
@@ -22,4 +22,5 @@ urlpatterns = [
     path('create_todo/', views.create_todo, name="create_todo"),
     path('delete_todo/<int:pk>/', views.delete_todo, name="delete_todo"),
     path('update_todo/<int:pk>/', views.update_todo, name="update_todo"),
+    path('stats/', views.todo_stats, name="todo_stats"),
 ]
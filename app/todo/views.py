@@ -1,26 +1,67 @@
 """
 Views for the todo APIs
 """
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication, SessionAuthentication  # noqa
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated  # noqa
 
 from core.models import Todo
-from todo import serializers
+from todo import imports, serializers, writes
+from todo.cache import get_or_set_list, get_todo_page, invalidate_todo_list
+from todo.conditional import (
+    collection_cache_name,
+    collection_condition,
+    todo_conditional_response,
+)
+from todo.export import aiterate, stream_csv, stream_ndjson
+from todo.filters import TodoFilterBackend, TodoFilterSerializer
+from todo.pagination import TodoCursorPagination
+from todo.parsers import CSVParser, NDJSONParser
+from todo.renderers import CSVRenderer, NDJSONRenderer
+from todo.stats import get_todo_stats
+from todo.sync import get_todo_changes
+from user.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 from django.views.decorators.http import require_http_methods
-from django.http.response import HttpResponse
+from django.http import Http404
+from django.http.response import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 
 
+def is_todo_id(value):
+    """Return whether a JSON value is an integer id, which bools are not."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
 class TodoViewSet(viewsets.ModelViewSet):
     """View for manage todo APIs."""
     serializer_class = serializers.TodoDetailSerializer
     queryset = Todo.objects.all()
-    authentication_classes = [SessionAuthentication]
+    authentication_classes = [
+        SignedTokenAuthentication,
+        CachedTokenAuthentication,
+        SessionAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
+    pagination_class = TodoCursorPagination
+    filter_backends = [TodoFilterBackend]
 
     def get_queryset(self):
         """Retrieve todos for authenticated user."""
@@ -31,19 +72,181 @@ class TodoViewSet(viewsets.ModelViewSet):
         """Return the serializer class for request."""
         if self.action == 'list':
             return serializers.TodoSerializer
+        elif self.action == 'stats':
+            return serializers.TodoStatsSerializer
+        elif self.action == 'sync':
+            return serializers.TodoSyncSerializer
+        elif self.action == 'import_todos':
+            return serializers.TodoImportSerializer
+        elif self.action == 'bulk':
+            if self.request.method == 'DELETE':
+                return serializers.TodoBulkDeleteSerializer
+            return serializers.TodoSerializer
 
         return self.serializer_class
 
+    @method_decorator(collection_condition)
+    def list(self, request, *args, **kwargs):
+        """List todos, serving repeated pages from the cache."""
+        data = get_or_set_list(
+            request.user.pk,
+            collection_cache_name(request),
+            self.list_data,
+        )
+        return Response(data)
+
+    def list_data(self):
+        """Return a page of todos, serialized from .values() rows."""
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *serializers.TodoSerializer.Meta.fields)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(
+            serializers.serialize_todo_rows(page)).data
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a todo, or a 304 if the client copy is current."""
+        instance = self.get_object()
+        return todo_conditional_response(
+            request,
+            instance,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def partial_update(self, request, *args, **kwargs):
+        """Update the given fields of a todo with a single UPDATE."""
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        todo = writes.update_todo(
+            request.user, kwargs[self.lookup_field],
+            serializer.validated_data)
+        if todo is None:
+            raise NotFound()
+
+        return Response(self.get_serializer(todo).data)
+
     def perform_create(self, serializer):
         """Create a new todo."""
         serializer.save(user=self.request.user)
 
-    # def partial_update(self, request, *args, **kwargs):
-    #     instance = self.get_object()
-    #     instance.status = not instance.status
-    #     instance.save()
-    #     todo = self.get_serializer(instance)
-    #     return Response(todo.data)
+    @action(methods=['GET'], detail=False)
+    def stats(self, request):
+        """Return todo counters for the authenticated user."""
+        serializer = self.get_serializer(get_todo_stats(request.user))
+        return Response(serializer.data)
+
+    @action(methods=['GET'], detail=False)
+    def sync(self, request):
+        """Return todos changed and deleted since the ?since= token."""
+        changes = get_todo_changes(
+            request.user, request.query_params.get('since'))
+        serializer = self.get_serializer(changes)
+        return Response(serializer.data)
+
+    @action(methods=['GET'], detail=False,
+            renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """Stream all matching todos as NDJSON or CSV (?format=)."""
+        queryset = self.filter_queryset(self.get_queryset())
+        renderer = request.accepted_renderer
+        stream = stream_csv if renderer.format == 'csv' else stream_ndjson
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f'; charset={renderer.charset}'
+
+        chunks = stream(queryset, settings.TODO_EXPORT_CHUNK_SIZE)
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiterate(chunks)
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="todos.{renderer.format}"')
+        return response
+
+    @action(methods=['POST'], detail=False, url_path='import',
+            parser_classes=[NDJSONParser, CSVParser])
+    def import_todos(self, request):
+        """Import todos from an NDJSON or CSV request body."""
+        result = imports.import_todos(request.user, request.data)
+        serializer = self.get_serializer(result)
+        status_code = status.HTTP_201_CREATED
+        if result['failed'] and not result['imported']:
+            status_code = status.HTTP_400_BAD_REQUEST
+        return Response(serializer.data, status=status_code)
+
+    @action(methods=['POST', 'PATCH', 'DELETE'], detail=False)
+    def bulk(self, request):
+        """Create, update or delete many todos in one transaction."""
+        if request.method == 'POST':
+            return self.bulk_create(request)
+        elif request.method == 'PATCH':
+            return self.bulk_update(request)
+
+        return self.bulk_destroy(request)
+
+    def bulk_create(self, request):
+        """Create a list of todos with a single insert."""
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            max_length=settings.TODO_BULK_MAX_BATCH_SIZE,
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save(user=request.user)
+            invalidate_todo_list(request.user.pk)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        """Update a list of todos, each identified by its id."""
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            partial=True,
+            max_length=settings.TODO_BULK_MAX_BATCH_SIZE,
+        )
+        serializer.is_valid(raise_exception=True)
+        ids = [item.get('id') for item in request.data]
+
+        with transaction.atomic():
+            todos = self.get_queryset().select_for_update().in_bulk(
+                [pk for pk in ids if is_todo_id(pk)])
+            errors, seen = [], set()
+            for pk in ids:
+                if not is_todo_id(pk):
+                    errors.append({'id': ['A valid integer is required.']})
+                elif pk not in todos:
+                    errors.append({'id': ['Not found.']})
+                elif pk in seen:
+                    errors.append({'id': ['Duplicate id.']})
+                else:
+                    errors.append({})
+                    seen.add(pk)
+            if any(errors):
+                raise ValidationError(errors)
+
+            serializer.instance = [todos[pk] for pk in ids]
+            serializer.save()
+            invalidate_todo_list(request.user.pk)
+
+        return Response(serializer.data)
+
+    def bulk_destroy(self, request):
+        """Delete a list of todos and record their tombstones in one query.
+
+        The per-row post_delete handlers are bypassed, as they would
+        insert one tombstone per todo.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        deleted = writes.delete_todos(request.user, ids)
+
+        return Response([
+            {'id': pk, 'status': 'deleted' if pk in deleted else 'not_found'}
+            for pk in ids
+        ])
 
 
 @login_required(redirect_field_name='next', login_url="/user/login")
@@ -56,9 +259,32 @@ class TodoListView(ListView):
 
 @login_required(redirect_field_name='next', login_url="/user/login")
 @require_http_methods(['GET'])
+@collection_condition
 def list_todos(request):
-    todos = Todo.objects.filter(user=request.user).order_by('-created_at')
-    return render(request, "todo/todos.html", {"todos": todos})
+    filters = TodoFilterSerializer(data=request.GET.dict())
+    if not filters.is_valid():
+        return HttpResponseBadRequest()
+
+    try:
+        page = get_todo_page(request)
+    except NotFound:
+        raise Http404('Invalid cursor')
+
+    if request.headers.get('HX-Request'):
+        response = render(request, "todo/partials/todo_list.html", page)
+    else:
+        stats = get_todo_stats(request.user)
+        response = render(request, "todo/todos.html",
+                          {**page, "stats": stats})
+    patch_vary_headers(response, ['HX-Request'])
+    return response
+
+
+@login_required(redirect_field_name='next', login_url="/user/login")
+@require_http_methods(['GET'])
+def todo_stats(request):
+    stats = get_todo_stats(request.user)
+    return render(request, "todo/partials/stats.html", {"stats": stats})
 
 
 @login_required(redirect_field_name='next', login_url="/user/login")
@@ -71,22 +297,26 @@ def create_todo(request):
             todo = Todo.objects.create(
                 user=request.user, content=content, status=False)
 
-        return render(request, "todo/partials/todo.html", {"todo": todo})
+        response = render(request, "todo/partials/todo.html", {"todo": todo})
+        response['HX-Trigger'] = 'todosChanged'
+        return response
 
 
 @login_required(redirect_field_name='next', login_url="/user/login")
 @require_http_methods(['PUT'])
 def update_todo(request, pk):
-    todo = Todo.objects.get(pk=pk)
-    todo.status = not todo.status
-    todo.save()
-    return render(request, "todo/partials/todo.html", {"todo": todo})
+    todo = writes.toggle_todo(request.user, pk)
+    if todo is None:
+        raise Http404('not exist')
+    response = render(request, "todo/partials/todo.html", {"todo": todo})
+    response['HX-Trigger'] = 'todosChanged'
+    return response
 
 
 @login_required(redirect_field_name='next', login_url="/user/login")
 @require_http_methods(['DELETE'])
 def delete_todo(request, pk):
-    todo = Todo.objects.get(pk=pk)
-    todo.delete()
+    if not writes.delete_todo(request.user, pk):
+        raise Http404('not exist')
 
-    return HttpResponse()
+    return HttpResponse(headers={'HX-Trigger': 'todosChanged'})
@@ -0,0 +1,106 @@
+"""
+Single-statement writes for the hot todo paths.
+
+Each helper changes todos of one user in a single round trip, with
+the change computed by Postgres so concurrent requests cannot overwrite
+each other. They bypass model signals, so they invalidate the cached
+todo lists themselves.
+"""
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.utils import timezone
+
+from core.models import Todo, TodoTombstone
+from todo.cache import invalidate_todo_list
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _column(name, model=Todo):
+    return connection.ops.quote_name(model._meta.get_field(name).column)
+
+
+def _todo_pk(pk):
+    """Return pk as a todo primary key, or None if it cannot be one."""
+    try:
+        return Todo._meta.pk.to_python(pk)
+    except ValidationError:
+        return None
+
+
+def _update_returning(user, pk, assignments, params):
+    """Run an UPDATE of a user's todo and return the updated row."""
+    pk = _todo_pk(pk)
+    if pk is None:
+        return None
+
+    assignments = [*assignments, f'{_column("updated_at")} = %s']
+    sql = (
+        f'UPDATE {_table(Todo)} SET {", ".join(assignments)} '
+        f'WHERE {_column("id")} = %s AND {_column("user")} = %s '
+        f'RETURNING *'
+    )
+    todos = list(Todo.objects.raw(
+        sql, [*params, timezone.now(), pk, user.pk]))
+    if not todos:
+        return None
+
+    invalidate_todo_list(user.pk)
+    return todos[0]
+
+
+def toggle_todo(user, pk):
+    """Flip the status of a user's todo and return it, or None."""
+    status = _column('status')
+    return _update_returning(user, pk, [f'{status} = NOT {status}'], [])
+
+
+def update_todo(user, pk, values):
+    """Set field values on a user's todo and return it, or None."""
+    assignments, params = [], []
+    for name, value in values.items():
+        field = Todo._meta.get_field(name)
+        assignments.append(f'{_column(name)} = %s')
+        params.append(field.get_db_prep_save(value, connection))
+
+    return _update_returning(user, pk, assignments, params)
+
+
+def delete_todos(user, pks):
+    """Delete todos of a user and record their tombstones.
+
+    Returns the ids of the todos that existed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH deleted AS ('
+            f'DELETE FROM {_table(Todo)} '
+            f'WHERE {_column("id")} = ANY(%s) AND {_column("user")} = %s '
+            f'RETURNING {_column("id")}, {_column("user")}) '
+            f'INSERT INTO {_table(TodoTombstone)} ('
+            f'{_column("user", TodoTombstone)}, '
+            f'{_column("todo_id", TodoTombstone)}, '
+            f'{_column("deleted_at", TodoTombstone)}) '
+            f'SELECT {_column("user")}, {_column("id")}, %s FROM deleted '
+            f'RETURNING {_column("todo_id", TodoTombstone)}',
+            [list(pks), user.pk, timezone.now()],
+        )
+        deleted = {row[0] for row in cursor.fetchall()}
+
+    if deleted:
+        invalidate_todo_list(user.pk)
+    return deleted
+
+
+def delete_todo(user, pk):
+    """Delete a user's todo and record its tombstone.
+
+    Returns whether the todo existed.
+    """
+    pk = _todo_pk(pk)
+    if pk is None:
+        return False
+
+    return bool(delete_todos(user, [pk]))
@@ -0,0 +1,152 @@
+"""
+Authentication classes for the APIs.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from user.tokens import (
+    ACCESS,
+    get_id_only_user,
+    get_token_user,
+    verify_token,
+)
+
+
+TOKEN_CACHE_KEY = 'user:token-user:{digest}'
+
+
+class LocalTTLCache:
+    """A bounded, thread-safe LRU cache whose entries expire."""
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_token_cache = LocalTTLCache(
+    settings.TOKEN_AUTH_LOCAL_CACHE_SIZE,
+    settings.TOKEN_AUTH_LOCAL_CACHE_TIMEOUT,
+)
+
+
+def get_token_cache_key(key):
+    """Return the cache key of a token, which does not reveal the token."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return TOKEN_CACHE_KEY.format(digest=digest)
+
+
+def invalidate_token(key):
+    """Forget the cached user of a token.
+
+    Other processes may keep their local copy for up to
+    TOKEN_AUTH_LOCAL_CACHE_TIMEOUT seconds. Users deactivated with
+    queryset.update(), which sends no signal, keep authenticating for up
+    to TOKEN_AUTH_CACHE_TIMEOUT seconds unless their tokens are
+    invalidated too.
+    """
+    cache_key = get_token_cache_key(key)
+    local_token_cache.delete(cache_key)
+    cache.delete(cache_key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches token to user lookups.
+
+    A lookup tries a small per-process LRU first, then the shared cache,
+    and only then joins the token and user tables. Only the user id and
+    active flag are cached, never the user row, and each request gets
+    its own user instance carrying just those, like signed tokens do.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        cached = local_token_cache.get(cache_key)
+        if cached is None:
+            cached = cache.get(cache_key)
+            if cached is None:
+                user, token = super().authenticate_credentials(key)
+                cached = (user.pk, user.is_active)
+                cache.set(cache_key, cached,
+                          settings.TOKEN_AUTH_CACHE_TIMEOUT)
+            local_token_cache.set(cache_key, cached)
+
+        user_id, is_active = cached
+        if not is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+
+        user = get_id_only_user(user_id, is_active)
+        token = self.get_model()(key=key, user=user)
+        token._state.adding = False
+        return user, token
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Authenticate with a stateless signed access token.
+
+    Clients send "Authorization: Bearer <access token>". The user is
+    built from the token without a database read, so request.user only
+    carries its id; the token payload is request.auth.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header.'))
+
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header.'))
+
+        payload = verify_token(token, ACCESS)
+        return get_token_user(payload), payload
+
+    def authenticate_header(self, request):
+        return self.keyword
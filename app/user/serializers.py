@@ -56,3 +56,8 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class SignedTokenSerializer(serializers.Serializer):
+    """Serializer for a signed refresh token."""
+    refresh = serializers.CharField()
@@ -0,0 +1,33 @@
+"""
+Signal handlers for the user app.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import invalidate_token
+from user.tokens import revoke_user_tokens
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop authenticating with a deleted token."""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """Refresh the cached user of a user's tokens when the user changes.
+
+    Deactivating a user also revokes their signed tokens. Saves touching
+    only last_login, done on every login, are ignored.
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+
+    for key in Token.objects.filter(user=instance).values_list(
+            'key', flat=True):
+        invalidate_token(key)
+    if not instance.is_active:
+        revoke_user_tokens(instance.pk)
@@ -0,0 +1,97 @@
+"""
+Tests for cached token authentication.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import (
+    CachedTokenAuthentication,
+    get_token_cache_key,
+    local_token_cache,
+)
+
+
+ME_URL = reverse('user:me')
+TODOS_URL = reverse('todo:todo-list')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are cached and invalidated."""
+
+    def setUp(self):
+        cache.clear()
+        local_token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123', name='User')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeated_requests_skip_token_lookup(self):
+        """Test the token is looked up once."""
+        self.client.get(ME_URL)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+        self.assertFalse([q for q in ctx.captured_queries
+                          if 'authtoken_token' in q['sql']])
+
+    def test_cache_holds_only_user_id(self):
+        """Test neither cache keeps the user row or shares instances."""
+        auth = CachedTokenAuthentication()
+        first, _ = auth.authenticate_credentials(self.token.key)
+        second, token = auth.authenticate_credentials(self.token.key)
+
+        cached = cache.get(get_token_cache_key(self.token.key))
+        self.assertEqual(cached, (self.user.pk, True))
+        self.assertEqual(second.pk, self.user.pk)
+        self.assertIsNot(first, second)
+        self.assertFalse(second.password)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_shared_cache_used_by_other_processes(self):
+        """Test a lookup falls back to the shared cache."""
+        self.client.get(ME_URL)
+        local_token_cache.clear()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(ME_URL)
+
+        self.assertFalse([q for q in ctx.captured_queries
+                          if 'authtoken_token' in q['sql']])
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops authenticating."""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivating a user invalidates their cached token."""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_todo_api_accepts_token(self):
+        """Test the todo API authenticates with a token."""
+        res = self.client.get(TODOS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
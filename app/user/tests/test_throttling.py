@@ -0,0 +1,143 @@
+"""
+Tests for login, token and signup rate limits.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.throttling import local_cache, parse_rate
+
+
+TOKEN_URL = reverse('user:token')
+CREATE_USER_URL = reverse('user:create')
+LOGIN_URL = reverse('user:login')
+
+RATE_LIMITS = {
+    'login': {'ip': '5/min', 'email': '2/min'},
+    'signup': {'ip': '1/hour'},
+}
+
+
+@override_settings(RATE_LIMITS=RATE_LIMITS)
+class RateLimitTests(TestCase):
+    """Test endpoints are rate limited by IP and email."""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        # Mid-window, so no attempts fall in the previous window.
+        patcher = patch('user.throttling.time')
+        patcher.start().time.return_value = 1800001830.0
+        self.addCleanup(patcher.stop)
+        get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123')
+        self.client = APIClient()
+
+    def post_token(self, email='user@example.com'):
+        return self.client.post(
+            TOKEN_URL, {'email': email, 'password': 'badpass'})
+
+    def test_token_limited_by_email(self):
+        """Test repeated attempts on one email are refused unhashed."""
+        self.post_token()
+        self.post_token()
+
+        with patch('user.serializers.authenticate') as patched:
+            res = self.post_token()
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+        patched.assert_not_called()
+        res = self.post_token(email='other@example.com')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_token_limited_by_ip(self):
+        """Test attempts across many emails are limited per IP."""
+        for n in range(5):
+            self.post_token(email=f'user{n}@example.com')
+
+        res = self.post_token(email='another@example.com')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_login_view_limited(self):
+        """Test the login form is limited before authenticating."""
+        payload = {'username': 'user@example.com', 'password': 'badpass'}
+        self.client.post(LOGIN_URL, payload)
+        self.client.post(LOGIN_URL, payload)
+
+        res = self.client.post(LOGIN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.get(LOGIN_URL).status_code,
+                         status.HTTP_200_OK)
+
+    def test_signup_limited(self):
+        """Test signups are limited per IP."""
+        payload = {'email': 'new@example.com', 'password': 'testpass123',
+                   'name': 'New'}
+        self.client.post(CREATE_USER_URL, payload)
+
+        payload['email'] = 'new2@example.com'
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_local_fallback(self):
+        """Test limits still apply when the shared cache fails."""
+        with patch.object(cache, 'get_many', side_effect=ConnectionError), \
+                self.assertLogs('user.throttling', 'WARNING'):
+            self.post_token()
+            self.post_token()
+            res = self.post_token()
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class ParseRateTests(SimpleTestCase):
+    """Test rate strings are parsed strictly."""
+
+    def test_parse_rate(self):
+        """Test the supported period units."""
+        self.assertEqual(parse_rate('5/min'), (5, 60))
+        self.assertEqual(parse_rate('10/hour'), (10, 3600))
+        self.assertEqual(parse_rate('1/s'), (1, 1))
+        self.assertEqual(parse_rate('100/day'), (100, 86400))
+
+    def test_parse_rate_invalid(self):
+        """Test unknown units and malformed rates are refused."""
+        for rate in ['5/month', '5/mo', '5', 'five/min', '5/']:
+            with self.subTest(rate=rate):
+                with self.assertRaises(ImproperlyConfigured):
+                    parse_rate(rate)
+
+
+@override_settings(RATE_LIMITS=RATE_LIMITS)
+class ClientIPTests(TestCase):
+    """Test which address rate limits count a client by."""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.client = APIClient()
+
+    def post_token(self, ip):
+        return self.client.post(
+            TOKEN_URL, {'email': f'{ip}@example.com', 'password': 'bad'},
+            HTTP_X_FORWARDED_FOR=ip)
+
+    def test_forwarded_for_ignored_without_proxies(self):
+        """Test clients cannot dodge limits by forging X-Forwarded-For."""
+        for n in range(5):
+            self.post_token(f'198.51.100.{n}')
+
+        res = self.post_token('198.51.100.99')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,127 @@
+"""
+Tests for stateless signed tokens.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Todo
+
+
+TOKEN_URL = reverse('user:token')
+REFRESH_URL = reverse('user:token-refresh')
+REVOKE_URL = reverse('user:token-revoke')
+ME_URL = reverse('user:me')
+TODOS_URL = reverse('todo:todo-list')
+
+
+class SignedTokenTests(TestCase):
+    """Test issuing, using, refreshing and revoking signed tokens."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123', name='User')
+        Todo.objects.create(user=self.user, content='todo')
+        self.client = APIClient()
+        res = self.client.post(TOKEN_URL, {
+            'email': 'user@example.com',
+            'password': 'testpass123',
+            'mode': 'signed',
+        })
+        self.tokens = res.data
+
+    def authenticate(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_create_signed_tokens(self):
+        """Test signed mode returns access and refresh tokens."""
+        self.assertIn('access', self.tokens)
+        self.assertIn('refresh', self.tokens)
+        self.assertNotIn('token', self.tokens)
+
+    def test_access_token_needs_no_auth_query(self):
+        """Test the todo API authenticates without reading users."""
+        self.authenticate(self.tokens['access'])
+
+        # The collection state and the page; no session, token or user.
+        with self.assertNumQueries(2):
+            res = self.client.get(TODOS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_me_with_access_token(self):
+        """Test the profile is loaded for a signed token."""
+        self.authenticate(self.tokens['access'])
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['email'], 'user@example.com')
+
+    def test_refresh_token_not_accepted_as_access(self):
+        """Test refresh tokens cannot authenticate requests."""
+        self.authenticate(self.tokens['refresh'])
+
+        res = self.client.get(TODOS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_expired_access_token(self):
+        """Test expired access tokens are rejected."""
+        self.authenticate(self.tokens['access'])
+
+        with patch('user.tokens.time.time', return_value=2 ** 40):
+            res = self.client.get(TODOS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh(self):
+        """Test a refresh token issues a working access token."""
+        res = self.client.post(REFRESH_URL,
+                               {'refresh': self.tokens['refresh']})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.authenticate(res.data['access'])
+        self.assertEqual(self.client.get(TODOS_URL).status_code,
+                         status.HTTP_200_OK)
+
+    def test_refresh_after_password_change(self):
+        """Test changing the password invalidates refresh tokens."""
+        self.user.set_password('newpass123')
+        self.user.save()
+
+        res = self.client.post(REFRESH_URL,
+                               {'refresh': self.tokens['refresh']})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_revoke(self):
+        """Test revoked tokens stop working."""
+        self.authenticate(self.tokens['access'])
+
+        res = self.client.post(REVOKE_URL,
+                               {'refresh': self.tokens['refresh']})
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        res = self.client.get(TODOS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.client.post(REFRESH_URL,
+                               {'refresh': self.tokens['refresh']})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deactivated_user_tokens_revoked(self):
+        """Test deactivating a user revokes their access tokens."""
+        self.authenticate(self.tokens['access'])
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(TODOS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,6 +1,7 @@
 """
 Tests for the user API.
 """
+import msgpack
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -108,6 +109,12 @@ class PublicUserApiTests(TestCase):
         self.assertNotIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_token_not_an_object(self):
+        """Test posting a JSON array returns an error."""
+        res = self.client.post(TOKEN_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_retrieve_user_unauthorized(self):
         """Test authentication is required for users."""
         res = self.client.get(ME_URL)
@@ -137,6 +144,18 @@ class PrivateUserApiTests(TestCase):
             'email': self.user.email,
         })
 
+    def test_profile_msgpack(self):
+        """Test the profile is read and updated as MessagePack."""
+        res = self.client.patch(
+            ME_URL, msgpack.packb({'name': 'Packed'}),
+            content_type='application/msgpack',
+            HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(res.content), {
+            'name': 'Packed', 'email': self.user.email})
+
     def test_post_me_not_allowed(self):
         """Test POST is not allowed for the me endpoint."""
         res = self.client.post(ME_URL, {})
@@ -0,0 +1,156 @@
+"""
+Sliding window rate limits for the login, token and signup endpoints.
+
+Attempts are counted per client IP and per email in the shared cache,
+so every worker sees the same counts; if the cache is unreachable each
+process falls back to counting on its own. A limited request is refused
+before its credentials are looked at, so it costs no password hash.
+"""
+import hashlib
+import logging
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from rest_framework.throttling import BaseThrottle
+
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY = 'ratelimit:{name}:{window}'
+PERIODS = {
+    's': 1, 'sec': 1, 'second': 1, 'seconds': 1,
+    'm': 60, 'min': 60, 'minute': 60, 'minutes': 60,
+    'h': 3600, 'hour': 3600, 'hours': 3600,
+    'd': 86400, 'day': 86400, 'days': 86400,
+}
+
+local_cache = LocMemCache('ratelimit', {'OPTIONS': {'MAX_ENTRIES': 10000}})
+
+
+def parse_rate(rate):
+    """Return the (limit, period in seconds) of a rate like '5/min'."""
+    try:
+        limit, period = rate.split('/')
+        return int(limit), PERIODS[period.strip().lower()]
+    except (KeyError, ValueError):
+        raise ImproperlyConfigured(
+            f'Invalid rate {rate!r}; use <count>/<{"|".join(PERIODS)}>.')
+
+
+def count_attempt(cache, name, limit, period):
+    """Count an attempt unless over the limit.
+
+    The count is the attempts in the current fixed window plus those of
+    the previous window weighted by how much of it the sliding window
+    still covers. Returns None if allowed, else seconds to wait.
+    """
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    current = RATE_LIMIT_KEY.format(name=name, window=int(window))
+    previous = RATE_LIMIT_KEY.format(name=name, window=int(window) - 1)
+
+    counts = cache.get_many([current, previous])
+    estimate = (counts.get(previous, 0) * (1 - elapsed / period) +
+                counts.get(current, 0))
+    if estimate >= limit:
+        return max(math.ceil(period - elapsed), 1)
+
+    cache.add(current, 0, timeout=period * 2)
+    try:
+        cache.incr(current)
+    except ValueError:
+        # The key expired between add() and incr().
+        cache.set(current, 1, timeout=period * 2)
+    return None
+
+
+def check_rate_limit(name, rate):
+    """Count an attempt against a rate in the shared cache."""
+    limit, period = parse_rate(rate)
+    try:
+        return count_attempt(
+            caches[settings.RATE_LIMIT_CACHE], name, limit, period)
+    except Exception:
+        logger.warning('Rate limit cache unavailable, counting locally.',
+                       exc_info=True)
+        return count_attempt(local_cache, name, limit, period)
+
+
+def get_idents(request, data):
+    """Return what a request is limited by: its IP and the email used.
+
+    The IP is read as DRF throttles do, so the NUM_PROXIES setting must
+    match the proxies in front of the app.
+    """
+    idents = {'ip': BaseThrottle().get_ident(request)}
+    email = hasattr(data, 'get') and (
+        data.get('email') or data.get('username'))
+    if isinstance(email, str) and email:
+        idents['email'] = hashlib.sha256(
+            email.strip().lower().encode()).hexdigest()
+    return idents
+
+
+def check_rate_limits(scope, idents):
+    """Count an attempt for a scope, returning seconds to wait if limited."""
+    waits = []
+    for kind, ident in idents.items():
+        rate = settings.RATE_LIMITS.get(scope, {}).get(kind)
+        if rate:
+            wait = check_rate_limit(f'{scope}:{kind}:{ident}', rate)
+            if wait is not None:
+                waits.append(wait)
+
+    return max(waits) if waits else None
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """DRF throttle limiting POSTs of a scope by IP and email."""
+    scope = None
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if request.method != 'POST':
+            return True
+
+        self.wait_seconds = check_rate_limits(
+            self.scope, get_idents(request, request.data))
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginRateThrottle(SlidingWindowThrottle):
+    scope = 'login'
+
+
+class SignupRateThrottle(SlidingWindowThrottle):
+    scope = 'signup'
+
+
+def rate_limit(scope):
+    """Limit POSTs to a Django view by IP and email, answering 429."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            if request.method == 'POST':
+                wait = check_rate_limits(
+                    scope, get_idents(request, request.POST))
+                if wait is not None:
+                    return HttpResponse(
+                        'Too many attempts, try again later.',
+                        status=429,
+                        headers={'Retry-After': str(wait)},
+                    )
+            return view_func(request, *args, **kwargs)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,121 @@
+"""
+Stateless signed access and refresh tokens.
+
+Tokens are signed with SECRET_KEY and carry the user id, so verifying an
+access token needs no database read. Revoked tokens and users are kept
+in a small deny-list in the shared cache until their tokens expire.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext as _
+from rest_framework import exceptions
+
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+TOKEN_SALT = 'user.token.{kind}'
+DENIED_TOKEN_KEY = 'user:token-denied:{jti}'
+DENIED_USER_KEY = 'user:token-denied-user:{user_id}'
+
+
+def get_lifetime(kind):
+    """Return the lifetime in seconds of a kind of token."""
+    if kind == ACCESS:
+        return settings.SIGNED_TOKEN_ACCESS_LIFETIME
+    return settings.SIGNED_TOKEN_REFRESH_LIFETIME
+
+
+def create_token(user, kind):
+    """Return a signed token of a kind for a user."""
+    now = int(time.time())
+    payload = {
+        'u': user.pk,
+        'j': uuid.uuid4().hex,
+        'iat': now,
+        'exp': now + get_lifetime(kind),
+    }
+    if kind == REFRESH:
+        # Changing the password invalidates refresh tokens, as it does
+        # sessions.
+        payload['h'] = user.get_session_auth_hash()
+
+    return signing.dumps(payload, salt=TOKEN_SALT.format(kind=kind))
+
+
+def create_token_pair(user):
+    """Return new access and refresh tokens for a user."""
+    return {
+        'access': create_token(user, ACCESS),
+        'refresh': create_token(user, REFRESH),
+        'expires_in': settings.SIGNED_TOKEN_ACCESS_LIFETIME,
+    }
+
+
+def verify_token(token, kind):
+    """Return the payload of a valid token of a kind.
+
+    It checks the signature, the expiry and the deny-list, which is a
+    single cache read; it does not touch the database.
+    """
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT.format(kind=kind))
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+    if payload['exp'] <= time.time():
+        raise exceptions.AuthenticationFailed(_('Token has expired.'))
+
+    denied_token_key = DENIED_TOKEN_KEY.format(jti=payload['j'])
+    denied_user_key = DENIED_USER_KEY.format(user_id=payload['u'])
+    denied = cache.get_many([denied_token_key, denied_user_key])
+    if denied_token_key in denied or \
+            payload['iat'] <= denied.get(denied_user_key, -1):
+        raise exceptions.AuthenticationFailed(_('Token has been revoked.'))
+
+    return payload
+
+
+def get_id_only_user(pk, is_active=True):
+    """Return a user instance carrying only its id and active flag."""
+    user = get_user_model()(pk=pk, is_active=is_active)
+    user._state.adding = False
+    user._state.db = 'default'
+    return user
+
+
+def get_token_user(payload):
+    """Return a user carrying only the id of a verified access token."""
+    return get_id_only_user(payload['u'])
+
+
+def refresh_access_token(token):
+    """Return a new access token for a valid refresh token."""
+    payload = verify_token(token, REFRESH)
+    try:
+        user = get_user_model().objects.get(pk=payload['u'], is_active=True)
+    except get_user_model().DoesNotExist:
+        raise exceptions.AuthenticationFailed(
+            _('User inactive or deleted.'))
+    if not constant_time_compare(payload['h'], user.get_session_auth_hash()):
+        raise exceptions.AuthenticationFailed(_('Token has been revoked.'))
+
+    return create_token(user, ACCESS)
+
+
+def revoke_token(payload):
+    """Deny a token until it expires."""
+    timeout = max(int(payload['exp'] - time.time()), 1)
+    cache.set(DENIED_TOKEN_KEY.format(jti=payload['j']), True, timeout)
+
+
+def revoke_user_tokens(user_id):
+    """Deny every token issued to a user so far."""
+    cache.set(DENIED_USER_KEY.format(user_id=user_id), int(time.time()),
+              settings.SIGNED_TOKEN_REFRESH_LIFETIME)
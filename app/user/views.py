@@ -1,36 +1,102 @@
 """
 Views for the user API.
 """
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from django.shortcuts import render
+from user import tokens
+from user.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from user.throttling import LoginRateThrottle, SignupRateThrottle
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
+    SignedTokenSerializer,
 )
 
 
 class CreateUserView(generics.CreateAPIView):
     """Create a new user in the system."""
     serializer_class = UserSerializer
+    throttle_classes = [SignupRateThrottle]
 
     def get(self, request, *args, **kwargs):
         return render(request, 'partials/register.html')
 
 
 class CreateTokenView(ObtainAuthToken):
-    """Create a new auth token for user."""
+    """Create a new auth token for user.
+
+    With mode=signed it returns short-lived signed access and refresh
+    tokens instead, which are verified without database reads.
+    """
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [LoginRateThrottle]
+
+    def post(self, request, *args, **kwargs):
+        # Bodies that are not objects fall through to the serializer's 400.
+        if not isinstance(request.data, dict) or \
+                request.data.get('mode') != 'signed':
+            return super().post(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            tokens.create_token_pair(serializer.validated_data['user']))
+
+
+class RefreshTokenView(APIView):
+    """Exchange a signed refresh token for a new access token."""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    serializer_class = SignedTokenSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        access = tokens.refresh_access_token(
+            serializer.validated_data['refresh'])
+        return Response({
+            'access': access,
+            'expires_in': tokens.get_lifetime(tokens.ACCESS),
+        })
+
+
+class RevokeTokenView(APIView):
+    """Revoke the signed access token of the request and a refresh token."""
+    authentication_classes = [SignedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = SignedTokenSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh = tokens.verify_token(
+            serializer.validated_data['refresh'], tokens.REFRESH)
+        if refresh['u'] == request.user.pk:
+            tokens.revoke_token(refresh)
+        tokens.revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        SignedTokenAuthentication, CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return the authenticated user."""
+        if isinstance(self.request.successful_authenticator,
+                      (SignedTokenAuthentication, CachedTokenAuthentication)):
+            # Token authentication only provides the user id.
+            return generics.get_object_or_404(
+                self.serializer_class.Meta.model, pk=self.request.user.pk)
         return self.request.user